@@ -0,0 +1,12 @@
+"""Helpers shared by the benchmark scripts"""
+
+
+def make_position(engine, plies, rng):
+    """Search board after plies random moves, played without a winner where possible"""
+    board = engine.new_board()
+    for ply in range(plies):
+        valid = board.valid_columns()
+        if not valid or board.winner is not None:
+            break
+        board.drop(rng.choice(valid), 1 + ply % 2)
+    return board
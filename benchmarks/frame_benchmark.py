@@ -0,0 +1,126 @@
+"""Compare frame times while the AI thinks in a background thread and in the engine process.
+
+Plays seeded Hard moves on the default board and renders frames at a 60 FPS
+target while the AI is thinking, then prints frame time percentiles per mode.
+With --ponder the frames are those of the player's turns instead, for
+--think-time seconds each while the AI ponders. A 60 FPS frame is 16.7 ms;
+anything well above that is a visible stall.
+
+    python benchmarks/frame_benchmark.py [--moves N] [--think-time S] [--seed N] [--ponder]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+import main  # noqa: E402
+
+
+def make_position(game, plies, rng):
+    for ply in range(plies):
+        valid = game.get_valid_locations()
+        if not valid or game.decided_winner is not None:
+            break
+        game.drop_piece(rng.choice(valid), 1 + ply % 2, animate=False)
+
+
+def render_frame(game, clock):
+    main.screen.fill(main.DARK_BLUE)
+    game.draw_board(main.screen)
+    game.draw_powerups(main.screen)
+    game.draw_game_status(main.screen)
+    pygame.display.update()
+    return clock.tick(60)
+
+
+def run(mode, moves, seed):
+    main.ENGINE_MODE = mode
+    rng = random.Random(seed)
+    random.seed(seed)
+    game = main.Connect8Game()
+    game.set_difficulty('hard')
+    make_position(game, 2 * main.COLS, rng)
+    clock = main.clock = pygame.time.Clock()  # draw_powerups reads the FPS from the global clock
+    stats = main.FrameStats()
+    try:
+        for _ in range(moves):
+            if game.decided_winner is not None or not game.get_valid_locations():
+                break
+            game.turn = 1
+            game.start_ai_move()
+            while game.ai_thinking:
+                pygame.event.pump()
+                game.poll_ai_move()
+                stats.record(render_frame(game, clock))
+            col, _, _ = game.ai_move
+            game.ai_move = None
+            if col is not None:
+                game.drop_piece(col, game.ai_piece, animate=False)
+            valid = game.get_valid_locations()
+            if valid and game.decided_winner is None:
+                game.drop_piece(rng.choice(valid), game.player_piece, animate=False)
+    finally:
+        if game.engine_process is not None:
+            game.engine_process.close()
+    return stats
+
+
+def run_ponder(mode, moves, seed, think_time):
+    main.ENGINE_MODE = mode
+    main.PONDER, main.PONDER_IN_THREAD = True, True
+    rng = random.Random(seed)
+    random.seed(seed)
+    game = main.Connect8Game()
+    game.set_difficulty('hard')
+    make_position(game, 2 * main.COLS, rng)
+    clock = main.clock = pygame.time.Clock()
+    stats = main.FrameStats()
+    try:
+        for _ in range(moves):
+            valid = game.get_valid_locations()
+            if game.decided_winner is not None or not valid:
+                break
+            game.turn = 0
+            game.start_pondering()
+            end = time.perf_counter() + think_time
+            while time.perf_counter() < end:
+                pygame.event.pump()
+                stats.record(render_frame(game, clock))
+            game.stop_pondering()
+            # Random moves for both sides: only the player's turn is measured
+            game.drop_piece(rng.choice(valid), game.player_piece, animate=False)
+            valid = game.get_valid_locations()
+            if valid and game.decided_winner is None:
+                game.drop_piece(rng.choice(valid), game.ai_piece, animate=False)
+    finally:
+        game.close()
+    return stats
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--moves', type=int, default=5)
+    parser.add_argument('--think-time', type=float, default=main.MAX_AI_THINK_TIME)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ponder', action='store_true', help="measure the player's turns while the AI ponders")
+    args = parser.parse_args()
+    main.MAX_AI_THINK_TIME = args.think_time
+    main.init_display()
+
+    for mode in ('thread', 'process'):
+        if args.ponder:
+            stats = run_ponder(mode, args.moves, args.seed, args.think_time)
+        else:
+            stats = run(mode, args.moves, args.seed)
+        print(f"{mode:>8}: {stats.summary()}")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,64 @@
+"""Measure how much move ordering improves alpha-beta pruning.
+
+Runs iterative deepening from a fixed set of seeded positions with move
+ordering on and off, and prints the nodes searched at every depth.
+
+    python benchmarks/ordering_benchmark.py [--max-depth N] [--positions N] [--seed N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import make_position  # noqa: E402
+from engine import BoardConfig, Engine  # noqa: E402
+from search import Searcher  # noqa: E402
+
+
+def nodes_per_depth(searcher, sim_board, max_depth):
+    """Iterative deepening like Engine.hard_move, returning the nodes of each iteration"""
+    searcher.start_search(sim_board)
+    searcher.principal_variation = []
+    counts = []
+    for depth in range(1, max_depth + 1):
+        before = searcher.nodes_searched
+        col, _, _ = searcher.search_root(depth, time.time(), sim_board)
+        if searcher.move_ordering and col is not None:
+            searcher.principal_variation = searcher.extract_pv(sim_board, col, depth)
+        counts.append(searcher.nodes_searched - before)
+    return counts
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-depth', type=int, default=5)
+    parser.add_argument('--positions', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for rows, cols in ((10, 16), (19, 23)):
+        engine = Engine(BoardConfig(rows, cols))
+        totals = {}
+        for ordering in (False, True):
+            rng = random.Random(args.seed)
+            totals[ordering] = [0] * args.max_depth
+            for _ in range(args.positions):
+                board = make_position(engine, 2 * cols, rng)
+                searcher = Searcher(rows, cols, engine.config.connect_n, think_time=math.inf)
+                searcher.move_ordering = ordering
+                for index, count in enumerate(nodes_per_depth(searcher, board, args.max_depth)):
+                    totals[ordering][index] += count
+
+        print(f"{rows}x{cols}: nodes per depth over {args.positions} positions")
+        print(f"{'depth':>5} {'unordered':>10} {'ordered':>10} {'ratio':>6}")
+        for depth in range(args.max_depth):
+            plain, ordered = totals[False][depth], totals[True][depth]
+            print(f"{depth + 1:>5} {plain:>10} {ordered:>10} {plain / max(ordered, 1):>6.2f}")
+
+
+if __name__ == '__main__':
+    main_cli()
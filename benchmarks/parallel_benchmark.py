@@ -0,0 +1,76 @@
+"""Measure how root-parallel Hard search scales with the number of worker processes.
+
+Runs a fixed-depth iterative deepening from seeded mid-game positions and reports
+nodes per second and wall time for each worker count. Root splitting searches
+more nodes than a single process (workers start with a weaker alpha), so compare
+the time column as well as nodes/s.
+
+    python benchmarks/parallel_benchmark.py [--rows N] [--cols N] [--depth N] [--workers 1,2,4] [--positions N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import make_position  # noqa: E402
+from engine import BoardConfig, Engine  # noqa: E402
+from parallel import ParallelSearch  # noqa: E402
+from search import Searcher  # noqa: E402
+
+CONNECT_N = 8
+
+
+def run(workers, positions, depth):
+    nodes = 0
+    elapsed = 0.0
+    if workers == 1:
+        searcher = Searcher(positions[0].rows, positions[0].cols, CONNECT_N, think_time=math.inf)
+        for position in positions:
+            searcher.reset()
+            result = searcher.iterative_deepening(depth, position.copy())
+            nodes += result.nodes
+            elapsed += result.elapsed
+        return nodes, elapsed
+
+    pool = ParallelSearch(workers, positions[0].rows, positions[0].cols, CONNECT_N)
+    try:
+        # Start the worker processes before timing
+        pool.iterative_deepening(1, positions[0].copy(), math.inf)
+        for position in positions:
+            result = pool.iterative_deepening(depth, position.copy(), math.inf)
+            nodes += result.nodes
+            elapsed += result.elapsed
+    finally:
+        pool.close()
+    return nodes, elapsed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=19)
+    parser.add_argument('--cols', type=int, default=23)
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--workers', default=f"1,2,{os.cpu_count() or 1}")
+    parser.add_argument('--positions', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engine = Engine(BoardConfig(args.rows, args.cols, CONNECT_N))
+    positions = [make_position(engine, 2 * args.cols, rng) for _ in range(args.positions)]
+    worker_counts = sorted({int(count) for count in args.workers.split(',')})
+
+    print(f"{args.rows}x{args.cols}, depth {args.depth}, {args.positions} positions, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'nodes':>9} {'nodes/s':>10} {'time s':>8} {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        nodes, elapsed = run(workers, positions, args.depth)
+        baseline = baseline or elapsed
+        print(f"{workers:>7} {nodes:>9} {nodes / elapsed:>10.0f} {elapsed:>8.2f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,81 @@
+"""Measure random playouts per second: one at a time on a BitBoard, and batched in NumPy.
+
+For each grid size, plays full random games from the empty board with the
+Python loop Expert mode uses per leaf and with BatchPlayouts at several batch
+sizes, then runs Expert's tree search for a while in both playout modes.
+
+    python benchmarks/playout_benchmark.py [--grids 10x16,19x23] [--batches 64,256,1024,4096] [--seconds N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BitBoard  # noqa: E402
+from engine import BoardConfig, Engine  # noqa: E402
+from rollouts import BatchPlayouts  # noqa: E402
+
+
+def python_playouts(rows, cols, seconds):
+    """Full random games per second, one BitBoard drop at a time"""
+    board = BitBoard(rows, cols, 8)
+    games = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        game = board.copy()
+        piece = 1
+        while game.winner is None:
+            columns = game.valid_columns()
+            if not columns:
+                break
+            game.drop(random.choice(columns), piece)
+            piece = 3 - piece
+        games += 1
+    return games / (time.perf_counter() - start)
+
+
+def batch_playouts(rows, cols, batch, seconds, seed):
+    playouts = BatchPlayouts(rows, cols, 8, seed)
+    board = BitBoard(rows, cols, 8)
+    games = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        playouts.run(board, 1, batch)
+        games += batch
+    return games / (time.perf_counter() - start)
+
+
+def tree_search(rows, cols, playout_batch, seconds):
+    """Expert's search from the empty board, returning its MCTSResult"""
+    engine = Engine(BoardConfig(rows, cols, 8), seconds)
+    engine.mcts.playout_batch = playout_batch
+    return engine.mcts.search(engine.new_board())
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--grids', default='10x16,19x23')
+    parser.add_argument('--batches', default='64,256,1024,4096')
+    parser.add_argument('--seconds', type=float, default=3.0, help="time per measurement")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    grids = [tuple(int(size) for size in grid.split('x')) for grid in args.grids.split(',')]
+    batches = [int(batch) for batch in args.batches.split(',')]
+    for rows, cols in grids:
+        print(f"{rows}x{cols}")
+        print(f"  python, one at a time: {python_playouts(rows, cols, args.seconds):8.0f} playouts/s")
+        for batch in batches:
+            rate = batch_playouts(rows, cols, batch, args.seconds, args.seed)
+            print(f"  numpy, batch {batch:5d}:   {rate:8.0f} playouts/s")
+        for playout_batch, mode in ((None, "python, 24 plies"), (256, "numpy, batch 256")):
+            result = tree_search(rows, cols, playout_batch, args.seconds)
+            print(f"  expert search, {mode}: {result.playouts_per_second:8.0f} playouts/s, {result.nodes} nodes")
+
+
+if __name__ == '__main__':
+    main_cli()
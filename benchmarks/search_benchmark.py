@@ -0,0 +1,103 @@
+"""Compare in-place make/unmake search against copying the board for every child.
+
+Runs a fixed-depth minimax from seeded mid-game positions on 10x16 and 19x23
+boards and reports nodes per second plus the tracemalloc peak of each search.
+
+    python benchmarks/search_benchmark.py [--depth N] [--positions N] [--seed N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import make_position  # noqa: E402
+from engine import BoardConfig, Engine  # noqa: E402
+from search import Searcher  # noqa: E402
+from transposition import TranspositionTable  # noqa: E402
+
+
+class CopyingSearcher(Searcher):
+    """The search as it was before make/unmake: every child gets its own board copy"""
+
+    def search_children(self, depth, alpha, beta, maximizing_player, start_time, sim_board, valid_locations,
+                        tt_move=None):
+        piece = self.ai_piece if maximizing_player else self.player_piece
+        moves = self.order_moves(valid_locations, tt_move, self.ply(sim_board), piece)
+        value = -math.inf if maximizing_player else math.inf
+        column = moves[0]
+        for col in moves:
+            child = sim_board.copy()
+            child.drop(col, piece)
+            new_score = self.minimax(depth - 1, alpha, beta, not maximizing_player, start_time, child)[1]
+            if maximizing_player:
+                if new_score > value:
+                    value, column = new_score, col
+                alpha = max(alpha, value)
+            else:
+                if new_score < value:
+                    value, column = new_score, col
+                beta = min(beta, value)
+            if alpha >= beta:
+                self.record_cutoff(col, self.ply(sim_board), depth, piece)
+                break
+        return column, value
+
+
+def run_search(board, searcher, depth):
+    searcher.reset()
+    searcher.start_search(board)
+    start = time.perf_counter()
+    searcher.minimax(depth, -math.inf, math.inf, True, time.time(), board)
+    return searcher.nodes_searched, time.perf_counter() - start
+
+
+def measure_peak(board, searcher, depth):
+    # A two-entry table keeps stored positions out of the search's own memory peak
+    searcher.transposition_table = TranspositionTable(2)
+    tracemalloc.start()
+    searcher.minimax(depth, -math.inf, math.inf, True, time.time(), board)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark(rows, cols, depth, positions, seed):
+    engine = Engine(BoardConfig(rows, cols))
+    results = {}
+    for name, searcher_class in (('copy-per-child', CopyingSearcher), ('make/unmake', Searcher)):
+        rng = random.Random(seed)
+        nodes = 0
+        elapsed = 0.0
+        peak = 0
+        for _ in range(positions):
+            board = make_position(engine, 2 * cols, rng)
+            searcher = searcher_class(rows, cols, engine.config.connect_n, think_time=math.inf)
+            searched, seconds = run_search(board, searcher, depth)
+            nodes += searched
+            elapsed += seconds
+            peak = max(peak, measure_peak(board, searcher, depth))
+        results[name] = (nodes, elapsed, peak)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--positions', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'grid':>6} {'mode':>15} {'nodes':>8} {'nodes/s':>10} {'peak KiB':>9}")
+    for rows, cols in ((10, 16), (19, 23)):
+        results = benchmark(rows, cols, args.depth, args.positions, args.seed)
+        for name, (nodes, elapsed, peak) in results.items():
+            print(f"{rows}x{cols:<3} {name:>15} {nodes:>8} {nodes / elapsed:>10.0f} {peak / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    main_cli()
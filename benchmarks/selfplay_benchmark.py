@@ -0,0 +1,169 @@
+"""Play the Easy, Medium and Hard AIs against each other and write the results as JSON.
+
+Every pair of difficulties plays one game with each side moving first, on
+10x16, 14x20 and 19x23 boards, with gravity on and off. With gravity off both
+sides hold the gravity off power-up on every move, so the AIs may place a piece
+on any empty cell. Each configuration runs in a fresh process so its peak RSS
+is its own.
+
+Per difficulty and configuration the output records nodes per second, the
+depth reached, time per move (p50/p95/max), and every game's result.
+
+    python benchmarks/selfplay_benchmark.py [--output FILE] [--seed N] [--think-time S] [--max-moves N]
+        [--grids 10x16,14x20,19x23] [--difficulties easy,medium,hard] [--gravity on,off]
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BitBoard  # noqa: E402
+from engine import BoardConfig, Engine  # noqa: E402
+
+CONNECT_N = 8
+
+
+class PlayerStats:
+    """Per-move measurements for one difficulty in one configuration"""
+
+    def __init__(self):
+        self.move_times = []
+        self.search_time = 0.0
+        self.nodes = 0
+        self.depths = []
+
+    def record(self, engine, difficulty, seconds):
+        self.move_times.append(seconds)
+        if not engine.searcher.nodes_searched:
+            return  # Random or gravity off move without a search
+        self.search_time += seconds
+        self.nodes += engine.searcher.nodes_searched
+        if difficulty == 'hard' and engine.last_search is not None:
+            self.depths.append(engine.last_search.depth)
+        elif difficulty == 'medium':
+            self.depths.append(3)
+
+    def summary(self):
+        times = np.array(self.move_times or [0.0])
+        return {
+            'moves': len(self.move_times),
+            'nodes': self.nodes,
+            'nodes_per_second': self.nodes / self.search_time if self.search_time else 0.0,
+            'depth_mean': float(np.mean(self.depths)) if self.depths else 0.0,
+            'depth_max': max(self.depths, default=0),
+            'move_time_p50': float(np.percentile(times, 50)),
+            'move_time_p95': float(np.percentile(times, 95)),
+            'move_time_max': float(times.max()),
+        }
+
+
+def play_game(rows, cols, gravity, first, second, think_time, max_moves, stats):
+    """One game between two difficulties; returns the result record"""
+    board = BitBoard(rows, cols, CONNECT_N)
+    # Each side gets an engine that plays its own piece
+    sides = []
+    for piece, difficulty in ((1, first), (2, second)):
+        config = BoardConfig(rows, cols, CONNECT_N, player_piece=3 - piece, ai_piece=piece)
+        sides.append((piece, difficulty, Engine(config, think_time)))
+
+    moves = 0
+    while board.winner is None and moves < max_moves:
+        piece, difficulty, engine = sides[moves % 2]
+        search_board = engine.board_from_array(board.to_array(np.intp))
+        engine.searcher.nodes_searched = 0
+        engine.last_search = None
+        start = time.perf_counter()
+        if difficulty == 'easy':
+            col, row = engine.easy_move(search_board, not gravity)
+        elif difficulty == 'medium':
+            col, row = engine.medium_move(search_board, not gravity)
+        else:
+            col, row, _ = engine.hard_move(search_board, not gravity)
+        stats[difficulty].record(engine, difficulty, time.perf_counter() - start)
+        if col is None:
+            break
+        if row is not None:
+            board.place(row, col, piece)
+        else:
+            board.drop(col, piece)
+        moves += 1
+
+    if board.winner is None:
+        result = 'draw'
+    else:
+        result = first if board.winner == 1 else second
+    return {'first': first, 'second': second, 'winner': result, 'moves': moves}
+
+
+def run_configuration(rows, cols, gravity, difficulties, seed, think_time, max_moves):
+    start = time.perf_counter()
+    stats = {difficulty: PlayerStats() for difficulty in difficulties}
+    games = []
+    for index, (first, second) in enumerate(itertools.permutations(difficulties, 2)):
+        random.seed(f"{seed}-{rows}x{cols}-{gravity}-{index}")
+        games.append(play_game(rows, cols, gravity, first, second, think_time, max_moves, stats))
+    return {
+        'rows': rows,
+        'cols': cols,
+        'gravity': gravity,
+        'games': games,
+        'players': {difficulty: player.summary() for difficulty, player in stats.items()},
+        'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='selfplay_results.json')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--think-time', type=float, default=1.0)
+    parser.add_argument('--max-moves', type=int, default=200)
+    parser.add_argument('--grids', default='10x16,14x20,19x23')
+    parser.add_argument('--difficulties', default='easy,medium,hard')
+    parser.add_argument('--gravity', default='on,off')
+    args = parser.parse_args()
+
+    grids = [tuple(int(size) for size in grid.split('x')) for grid in args.grids.split(',')]
+    difficulties = args.difficulties.split(',')
+    gravities = [mode == 'on' for mode in args.gravity.split(',')]
+
+    configurations = []
+    # A fresh process per configuration keeps peak memory figures separate
+    context = multiprocessing.get_context('spawn')
+    for (rows, cols), gravity in itertools.product(grids, gravities):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_configuration, rows, cols, gravity, difficulties, args.seed,
+                                 args.think_time, args.max_moves).result()
+        configurations.append(result)
+        hard = result['players'].get('hard')
+        summary = f", hard {hard['nodes_per_second']:.0f} nodes/s, depth {hard['depth_mean']:.1f}" if hard else ""
+        print(f"{rows}x{cols} gravity {'on' if gravity else 'off'}: {result['elapsed']:.1f}s{summary}")
+
+    report = {
+        'seed': args.seed,
+        'think_time': args.think_time,
+        'max_moves': args.max_moves,
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'configurations': configurations,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,231 @@
+import numpy as np
+
+from transposition import zobrist_keys
+
+
+class BitBoard:
+    """Connect-N board stored as one Python int per player.
+
+    Every column takes ROWS + 1 bits. Bit 0 of a column is the bottom cell and
+    the extra top bit is always empty, so shifted lines never wrap from one
+    column into the next.
+    """
+
+    def __init__(self, rows, cols, connect_n=8):
+        self.rows = rows
+        self.cols = cols
+        self.connect_n = connect_n
+        self.height = rows + 1
+        self.bits = [0, 0, 0]  # Indexed by piece value (1 = player, 2 = AI)
+        self.history = []  # (bit, cell, piece, previous winner) for every placement or cleared column, used by undo
+        self.winner = None  # Piece that completed the first line, cached for O(1) terminal tests
+        self.evaluation = None  # Optional EvalState kept in sync with every placement
+        self.keys, self.side_key = zobrist_keys(rows, cols)
+        self.hash = 0  # Zobrist hash of the pieces on the board
+
+        self.column_mask = (1 << rows) - 1
+        self.board_mask = 0
+        self.top_mask = 0
+        for col in range(cols):
+            self.board_mask |= self.column_mask << (col * self.height)
+            self.top_mask |= 1 << (col * self.height + rows - 1)
+
+        # Vertical, horizontal, diagonal (positive slope), diagonal (negative slope)
+        self.shifts = (1, self.height, self.height + 1, self.height - 1)
+
+    @classmethod
+    def from_array(cls, board, connect_n=8, evaluation=None):
+        """Build a bitboard from a (ROWS, COLS) array of 0/1/2 cells
+
+        `evaluation` must already describe the same board; it is updated from
+        then on by every place, undo and clear_column.
+        """
+        rows, cols = board.shape
+        bitboard = cls(rows, cols, connect_n)
+        for piece in (1, 2):
+            for row, col in zip(*np.nonzero(board == piece)):
+                bitboard.bits[piece] |= bitboard.cell_bit(int(row), int(col))
+                bitboard.hash ^= bitboard.keys[piece][int(row) * cols + int(col)]
+        bitboard.refresh_winner()
+        bitboard.evaluation = evaluation
+        return bitboard
+
+    @classmethod
+    def from_bits(cls, rows, cols, connect_n, player_bits, ai_bits, evaluation=None):
+        """Rebuild a bitboard from the two player ints, e.g. after sending them to another process"""
+        bitboard = cls(rows, cols, connect_n)
+        for piece, bits in ((1, player_bits), (2, ai_bits)):
+            bitboard.bits[piece] = bits
+            while bits:
+                low = bits & -bits
+                col, offset = divmod(low.bit_length() - 1, bitboard.height)
+                bitboard.hash ^= bitboard.keys[piece][(rows - 1 - offset) * cols + col]
+                bits ^= low
+        bitboard.refresh_winner()
+        bitboard.evaluation = evaluation
+        return bitboard
+
+    def to_array(self, dtype=float):
+        """Return the board as a (ROWS, COLS) array like Connect8Game.board"""
+        nbytes = (self.cols * self.height + 7) // 8
+        board = np.zeros((self.cols, self.height), dtype=dtype)
+        for piece in (1, 2):
+            raw = np.frombuffer(self.bits[piece].to_bytes(nbytes, 'little'), dtype=np.uint8)
+            cells = np.unpackbits(raw, bitorder='little')[:self.cols * self.height]
+            board += cells.reshape(self.cols, self.height).astype(dtype) * piece
+        # Columns are stored bottom-up, the array is indexed from the top row
+        return board[:, self.rows - 1::-1].T.copy()
+
+    def copy(self):
+        other = BitBoard.__new__(BitBoard)
+        other.__dict__.update(self.__dict__)
+        other.bits = self.bits[:]
+        other.history = self.history[:]
+        if self.evaluation is not None:
+            other.evaluation = self.evaluation.copy()
+        return other
+
+    def cell_bit(self, row, col):
+        return 1 << (col * self.height + self.rows - 1 - row)
+
+    def occupied(self):
+        return self.bits[1] | self.bits[2]
+
+    def get(self, row, col):
+        bit = self.cell_bit(row, col)
+        if self.bits[1] & bit:
+            return 1
+        if self.bits[2] & bit:
+            return 2
+        return 0
+
+    def empty_cells(self):
+        """(row, col) of every empty cell, top row first, for gravity off placements"""
+        occupied = self.occupied()
+        return [(row, col) for row in range(self.rows) for col in range(self.cols)
+                if not occupied & self.cell_bit(row, col)]
+
+    def is_valid_column(self, col):
+        return 0 <= col < self.cols and not self.occupied() & (1 << (col * self.height + self.rows - 1))
+
+    def valid_columns_mask(self):
+        """Top-cell bits of every column that still accepts a piece"""
+        return self.top_mask & ~self.occupied()
+
+    def valid_columns(self):
+        mask = self.valid_columns_mask()
+        columns = []
+        while mask:
+            low = mask & -mask
+            columns.append((low.bit_length() - 1) // self.height)
+            mask ^= low
+        return columns
+
+    def next_open_row(self, col):
+        """Lowest empty row in a column, or -1 if the column is full"""
+        column = (self.occupied() >> (col * self.height)) & self.column_mask
+        if column == self.column_mask:
+            return -1
+        lowest_empty = ~column & (column + 1)
+        return self.rows - lowest_empty.bit_length()
+
+    def place(self, row, col, piece):
+        """Put a piece on a specific empty cell (gravity off placement)"""
+        bit = self.cell_bit(row, col)
+        cell = row * self.cols + col
+        self.bits[piece] |= bit
+        self.history.append((bit, cell, piece, self.winner))
+        self.hash ^= self.keys[piece][cell]
+        if self.winner is None and self.completes_line(bit, piece):
+            self.winner = piece
+        if self.evaluation is not None:
+            self.evaluation.add(cell, piece)
+
+    def drop(self, col, piece):
+        """Drop a piece into a column; returns the row it landed on or -1"""
+        row = self.next_open_row(col)
+        if row != -1:
+            self.place(row, col, piece)
+        return row
+
+    def undo(self):
+        bit, cell, piece, self.winner = self.history.pop()
+        if not bit:
+            # A cleared column: cell is the column and piece the (cell, piece) pairs it held
+            for cell, piece in piece:
+                self.bits[piece] |= self.cell_bit(*divmod(cell, self.cols))
+                self.hash ^= self.keys[piece][cell]
+                if self.evaluation is not None:
+                    self.evaluation.add(cell, piece)
+            return
+        self.bits[piece] ^= bit
+        self.hash ^= self.keys[piece][cell]
+        if self.evaluation is not None:
+            self.evaluation.remove(cell, piece)
+
+    def clear_column(self, col):
+        """Remove every piece in a column, the column remover power-up; undo puts them back"""
+        cleared = []
+        for row in range(self.rows):
+            piece = self.get(row, col)
+            if piece:
+                cell = row * self.cols + col
+                cleared.append((cell, piece))
+                self.hash ^= self.keys[piece][cell]
+                if self.evaluation is not None:
+                    self.evaluation.remove(cell, piece)
+        self.history.append((0, col, tuple(cleared), self.winner))
+        mask = ~(self.column_mask << (col * self.height))
+        self.bits[1] &= mask
+        self.bits[2] &= mask
+        self.refresh_winner()
+
+    def refresh_winner(self):
+        """Recompute the cached winner with a full scan after a non-incremental change"""
+        if self.has_won(2):
+            self.winner = 2
+        elif self.has_won(1):
+            self.winner = 1
+        else:
+            self.winner = None
+
+    def wins_at(self, row, col, piece):
+        return self.completes_line(self.cell_bit(row, col), piece)
+
+    def completes_line(self, bit, piece):
+        """Walk only the four lines through one cell, O(connect_n) instead of O(board)"""
+        bits = self.bits[piece]
+        for shift in self.shifts:
+            count = 1
+            probe = bit << shift
+            while bits & probe:
+                count += 1
+                probe <<= shift
+            probe = bit >> shift
+            while bits & probe:
+                count += 1
+                probe >>= shift
+            if count >= self.connect_n:
+                return True
+        return False
+
+    def position_key(self, maximizing_player):
+        """Hash of the position including whose turn it is"""
+        return self.hash ^ self.side_key if maximizing_player else self.hash
+
+    def has_won(self, piece):
+        """Check for connect-n of a piece using shift-and-AND on every direction"""
+        bits = self.bits[piece]
+        n = self.connect_n
+        for shift in self.shifts:
+            # After each doubling, a bit survives only where a run of `span` starts
+            run = bits
+            span = 1
+            while span * 2 <= n:
+                run &= run >> (shift * span)
+                span *= 2
+            if span < n:
+                run &= run >> (shift * (n - span))
+            if run:
+                return True
+        return False
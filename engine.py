@@ -0,0 +1,443 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from bitboard import BitBoard
+from evaluation import EvalState, get_evaluator
+from mcts import MonteCarloSearch
+from movegen import PowerUps
+from opening_book import load_book
+from parallel import ParallelSearch
+from position_cache import PositionCache
+from search import SearchStats, Searcher
+from threats import ThreatMap
+
+
+class BoardConfig:
+    """Board size, line length and piece values an engine plays with"""
+
+    def __init__(self, rows=10, cols=16, connect_n=8, player_piece=1, ai_piece=2):
+        self.rows = rows
+        self.cols = cols
+        self.connect_n = connect_n
+        self.player_piece = player_piece
+        self.ai_piece = ai_piece
+
+    def key(self):
+        return (self.rows, self.cols, self.connect_n, self.player_piece, self.ai_piece)
+
+    def __eq__(self, other):
+        return isinstance(other, BoardConfig) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return (f"BoardConfig(rows={self.rows}, cols={self.cols}, connect_n={self.connect_n}, "
+                f"player_piece={self.player_piece}, ai_piece={self.ai_piece})")
+
+
+class Engine:
+    """Headless AI: move selection for every difficulty, importable without pygame
+
+    Boards are BitBoards that carry an EvalState for the AI (see new_board and
+    board_from_array), and the AI is always the side to move. The engine keeps
+    its searcher between moves, so the transposition table and history scores
+    carry over.
+    """
+
+    def __init__(self, config, think_time=3.0, table_size=1 << 18, workers=1):
+        self.config = config
+        self.think_time = think_time  # Seconds a search may take
+        self.workers = workers  # More than 1 splits Hard searches across a process pool
+        self.table_size = table_size
+        self.evaluator = get_evaluator(config.rows, config.cols, config.connect_n, config.player_piece,
+                                       config.ai_piece)
+        self.searcher = Searcher(config.rows, config.cols, config.connect_n, config.player_piece, config.ai_piece,
+                                 table_size, think_time)
+        self.parallel_search = None  # Process pool, created on the first search with workers > 1
+        self.last_search = None  # SearchResult of the last Hard move
+        self.collect_stats = False  # Fill in a SearchStats for every move
+        self.last_stats = None  # SearchStats of the last move, when collect_stats is on
+        self.move_start = 0.0
+        # Hard moves for the first plies, built offline by tools/build_opening_book.py
+        self.book = load_book(config.rows, config.cols, config.connect_n)
+        self.position_cache = None  # PositionCache of Hard results shared across games, see open_position_cache
+        self.ponder_replies = 3  # Player replies searched ahead by ponder
+        self.ponder_results = {}  # position_key(True) after a pondered reply -> SearchResult
+        # Expert mode's Monte Carlo tree, kept between moves
+        self.mcts = MonteCarloSearch(self.evaluator, config.player_piece, config.ai_piece, think_time)
+
+    def reset(self):
+        """Forget everything learned in the current game"""
+        self.searcher.reset()
+        self.last_search = None
+        self.ponder_results = {}
+        self.mcts.reset()
+
+    def begin_move(self):
+        """Start collecting SearchStats for a new AI move, if enabled"""
+        self.searcher.stats = SearchStats() if self.collect_stats else None
+        self.move_start = time.time()
+
+    def end_move(self):
+        stats = self.searcher.stats
+        if stats is not None:
+            stats.elapsed = time.time() - self.move_start
+            self.last_stats = stats
+        return stats
+
+    def close(self):
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+        self.open_position_cache(None)
+
+    def open_position_cache(self, path):
+        """Use the persistent position cache in file path, or none if path is None"""
+        if self.position_cache is not None:
+            if self.position_cache.path == path:
+                return
+            self.position_cache.close()
+            self.position_cache = None
+        if path is not None:
+            try:
+                self.position_cache = PositionCache(path)
+            except (OSError, ValueError) as e:
+                print(f"Position cache disabled: {e}")
+
+    def new_board(self):
+        board = BitBoard(self.config.rows, self.config.cols, self.config.connect_n)
+        board.evaluation = EvalState(self.evaluator, self.config.ai_piece)
+        return board
+
+    def board_from_array(self, cells):
+        """Search board for a (rows, cols) array of 0/1/2 cells"""
+        cells = np.asarray(cells, dtype=np.intp)
+        evaluation = EvalState(self.evaluator, self.config.ai_piece, cells)
+        return BitBoard.from_array(cells, self.config.connect_n, evaluation)
+
+    def evaluate(self, board, piece):
+        """score_position for piece; O(1) when the board carries that piece's evaluation"""
+        if isinstance(board, BitBoard):
+            if board.evaluation is not None and board.evaluation.piece == piece:
+                return board.evaluation.score
+            board = board.to_array(np.intp)
+        return self.evaluator.score(board, piece)
+
+    def threat_map(self, board):
+        """Winning cells, open threats and placement scores for every empty cell, see threats.py"""
+        return ThreatMap(self.evaluator, board, self.config.ai_piece)
+
+    def forced_move(self, board, gravity_off=False):
+        """A move the position demands, found without searching, or None
+
+        In order: win now; block the player's winning cell; make a double
+        threat the player can only half block; take the cell where the player
+        would make one. The AI's moves are every empty cell when it places with
+        gravity off, otherwise the lowest empty cell of each column; the
+        player is assumed to answer with gravity. Returns (col, row) like the
+        other move functions, with row None for a normal drop.
+        """
+        config = self.config
+        ai_piece, player_piece = config.ai_piece, config.player_piece
+        threats = self.threat_map(board)
+        cols = config.cols
+
+        # Lowest empty cell of every column that isn't full
+        playable = {}
+        for col in board.valid_columns():
+            playable[col] = board.next_open_row(col) * cols + col
+
+        def playable_after(cell, piece):
+            """Cells the next player can drop into after piece is placed on cell"""
+            col = cell % cols
+            board.place(cell // cols, col, piece)
+            row = board.next_open_row(col)
+            board.undo()
+            after = set(playable.values())
+            after.discard(playable.get(col))
+            if row != -1:
+                after.add(row * cols + col)
+            return after
+
+        if gravity_off:
+            candidates = np.flatnonzero(threats.empty).tolist()
+        else:
+            # Center columns first, like the search's move ordering
+            center = (cols - 1) / 2
+            candidates = [playable[col] for col in sorted(playable, key=lambda col: abs(col - center))]
+
+        def move(cell):
+            row, col = divmod(cell, cols)
+            return (col, row) if gravity_off else (col, None)
+
+        # Win if we can
+        ai_wins = set(threats.wins[ai_piece].tolist())
+        for cell in candidates:
+            if cell in ai_wins:
+                return move(cell)
+
+        # Block the player's win: first a cell the player can drop into next, then with
+        # gravity off a floating one, before the player builds up to it
+        player_wins = set(threats.wins[player_piece].tolist())
+        reachable_wins = player_wins & set(playable.values())
+        for blocks in (reachable_wins, player_wins if gravity_off else ()):
+            for cell in candidates:
+                if cell in blocks:
+                    return move(cell)
+
+        # Two winning replies the player can't both block, without opening a win for the player
+        for cell in candidates:
+            if threats.threats[ai_piece][cell] == 0:
+                continue
+            after = playable_after(cell, ai_piece)
+            if (len(threats.wins_after(ai_piece, cell, ai_piece) & after) >= 2
+                    and not threats.wins_after(player_piece, cell, ai_piece) & after):
+                return move(cell)
+
+        # Take the cell where the player's drop would make such a double threat
+        candidate_cells = set(candidates)
+        for cell in playable.values():
+            if threats.threats[player_piece][cell] == 0 or cell not in candidate_cells:
+                continue
+            after = playable_after(cell, player_piece)
+            if (len(threats.wins_after(player_piece, cell, player_piece) & after) >= 2
+                    and not threats.wins_after(ai_piece, cell, player_piece) & after
+                    and not threats.wins_after(player_piece, cell, ai_piece) & playable_after(cell, ai_piece)):
+                return move(cell)
+        return None
+
+    def ponder_candidates(self, board):
+        """The player's likeliest replies: the one the last PV expects, then by move ordering"""
+        pv = self.last_search.principal_variation if self.last_search is not None else []
+        expected = pv[1] if len(pv) > 1 else None
+        ordered = self.searcher.order_moves(board.valid_columns(), None, 1, self.config.player_piece, expected)
+        return ordered[:self.ponder_replies]
+
+    def ponder(self, board, stop_check, max_depth=5):
+        """Search the AI's answer to each likely player reply until stop_check() returns True
+
+        Runs while the player thinks, on the position with the player to move.
+        Finished searches go to ponder_results, which hard_move answers from
+        at once; any other work stays in the transposition table and speeds
+        up the real search. Must not run at the same time as a move search.
+        """
+        self.ponder_results = {}
+        self.searcher.think_time = self.think_time
+        self.searcher.stats = None  # Statistics describe the AI's moves, not pondering
+        self.searcher.stop_check = stop_check
+        try:
+            for col in self.ponder_candidates(board):
+                if stop_check():
+                    break
+                child = board.copy()
+                child.drop(col, self.config.player_piece)
+                if child.winner is not None:
+                    continue
+                result = self.searcher.iterative_deepening(max_depth, child)
+                if result.column is not None:
+                    self.ponder_results[child.position_key(True)] = result
+        finally:
+            self.searcher.stop_check = None
+
+    def win_probability(self, board, batch=1024):
+        """Share of batch random playouts from board, with the AI to move, that the AI wins; draws count half"""
+        ai_piece = self.config.ai_piece
+        return self.mcts.get_batch_playouts().win_probability(board, ai_piece, ai_piece, batch)
+
+    def search(self, board, max_depth=5, powerups=None):
+        """Iterative deepening search for the AI's best column, returning a SearchResult
+
+        With powerups (a PowerUps) the search also weighs spending them, and
+        the result may be a gravity off placement or a column removal. Such
+        searches always run here, not in the process pool.
+        """
+        self.searcher.think_time = self.think_time
+        if powerups is not None:
+            self.searcher.powerups = powerups
+            try:
+                self.last_search = self.searcher.iterative_deepening(max_depth, board)
+            finally:
+                self.searcher.powerups = None
+        elif self.workers > 1:
+            self.last_search = self.get_parallel_search().iterative_deepening(max_depth, board, self.think_time)
+            # The workers search the tree, so only totals are known here
+            if self.searcher.stats is not None:
+                self.searcher.stats.nodes += self.last_search.nodes
+                self.searcher.stats.depth = self.last_search.depth
+        else:
+            self.last_search = self.searcher.iterative_deepening(max_depth, board)
+        return self.last_search
+
+    def get_parallel_search(self):
+        """Process pool for root-parallel searches, rebuilt if the worker count changed"""
+        if self.parallel_search is not None and self.parallel_search.config[0] != self.workers:
+            self.close()
+        if self.parallel_search is None:
+            config = self.config
+            self.parallel_search = ParallelSearch(self.workers, config.rows, config.cols, config.connect_n,
+                                                  config.player_piece, config.ai_piece, self.table_size)
+        return self.parallel_search
+
+    def choose_move(self, board, difficulty, column_remover=False, gravity_off=False):
+        """Pick the AI's action for a difficulty and the power-ups it holds
+
+        Returns (col, row, powerup): row is set for gravity off placements, and
+        powerup is 'column_remover' when the AI wants to clear column col.
+        hard_move and expert_move search their power-ups and return this
+        triple themselves; easy_move and medium_move return (col, row), and
+        the column remover is used at random for them here.
+        """
+        self.begin_move()
+        try:
+            # Expert and Hard weigh their power-ups against drops in their searches
+            if difficulty == 'expert':
+                return self.expert_move(board, gravity_off, column_remover)
+            if difficulty == 'hard':
+                return self.hard_move(board, gravity_off, column_remover)
+
+            # Check if AI should use column remover powerup
+            if column_remover and random.random() > 0.5:
+                # Find a column with opponent pieces to remove
+                opponent_columns = [col for col in range(self.config.cols)
+                                    if (board.bits[self.config.player_piece] >> (col * board.height))
+                                    & board.column_mask]
+                if opponent_columns:
+                    return random.choice(opponent_columns), None, 'column_remover'
+
+            # Make a regular move or use gravity off
+            if difficulty == 'medium':
+                col, row = self.medium_move(board, gravity_off)
+            else:
+                col, row = self.easy_move(board, gravity_off)
+            return col, row, None
+
+        except Exception as e:
+            print(f"AI thinking error: {e}")
+            # Fallback to random move if there's an error
+            valid_locations = board.valid_columns()
+            if valid_locations:
+                return random.choice(valid_locations), None, None
+            return None, None, None  # No valid moves
+        finally:
+            self.end_move()
+
+    def easy_move(self, board, gravity_off=False):
+        """Easy difficulty: Random valid move"""
+        # If gravity off is active, choose a random empty cell
+        if gravity_off and random.random() > 0.3:  # 70% chance to use gravity off
+            valid_cells = board.empty_cells()
+            if valid_cells:
+                row, col = random.choice(valid_cells)
+                return col, row
+
+        # Otherwise use regular gravity mode
+        valid_locations = board.valid_columns()
+        if valid_locations:
+            return random.choice(valid_locations), None
+        return None, None
+
+    def medium_move(self, board, gravity_off=False):
+        """Medium difficulty: Minimax with limited depth (3)"""
+        # If gravity off is active, use it sometimes
+        use_gravity_off = gravity_off and random.random() > 0.3  # 70% chance to use gravity off
+
+        # Wins, blocks and double threats need no search
+        move = self.forced_move(board, use_gravity_off)
+        if move is not None:
+            return move
+
+        if use_gravity_off:
+            # Try to find strategic places instead of random
+            best_cell = self.threat_map(board).best_cell()
+            if best_cell:
+                return best_cell[1], best_cell[0]  # Return as col, row
+
+        try:
+            start_time = time.time()
+            self.searcher.think_time = self.think_time
+            self.searcher.start_search(board)
+            col, _ = self.searcher.minimax(3, -math.inf, math.inf, True, start_time, board)
+            if self.searcher.stats is not None:
+                self.searcher.stats.depth = 3
+            return col, None
+        except TimeoutError:
+            return self.easy_move(board, gravity_off)
+
+    def hard_move(self, board, gravity_off=False, column_remover=False):
+        """Hard difficulty: Full Minimax with Alpha-Beta Pruning, over drops and the power-ups the AI holds"""
+        ai_piece = self.config.ai_piece
+
+        # Win if we can, otherwise block the player's winning cell or play a double threat
+        move = self.forced_move(board, gravity_off)
+        if move is not None:
+            col, row = move
+            if row is not None and board.next_open_row(col) == row:
+                row = None  # A drop lands there too, so gravity off is kept for later
+            # Removing a column can answer what one piece can't, like two winning cells at once,
+            # so while the AI holds one only a win skips the search
+            landing = board.next_open_row(col) if row is None else row
+            if not column_remover or board.wins_at(landing, col, ai_piece):
+                return col, row, None
+
+        held = [(ai_piece, powerup) for powerup, active in (('gravity_off', gravity_off),
+                                                           ('column_remover', column_remover)) if active]
+        max_depth = 5
+        cache = None
+        # Books, pondered replies and cached results only know drops
+        if not held:
+            # Positions every game starts with were searched deeply offline
+            if self.book is not None:
+                col = self.book.lookup(board, ai_piece)
+                if col is not None:
+                    return col, None, None
+
+            # Replies searched while the player was thinking
+            pondered = self.ponder_results.get(board.position_key(True))
+            if pondered is not None and pondered.depth >= max_depth and board.is_valid_column(pondered.column):
+                self.last_search = pondered
+                if self.searcher.stats is not None:
+                    self.searcher.stats.depth = pondered.depth
+                return pondered.column, None, None
+
+            # So were positions finished to full depth in earlier games
+            cache = self.position_cache
+            if cache is not None:
+                cached = cache.probe(board.position_key(True), self.config, max_depth)
+                if cached is not None and board.is_valid_column(cached[0]):
+                    return cached[0], None, None
+
+        try:
+            # Use iterative deepening to ensure we always have a move
+            valid_locations = board.valid_columns()
+            best_move = (random.choice(valid_locations) if valid_locations else None, None, None)
+
+            result = self.search(board, max_depth, PowerUps(held) if held else None)  # Up to depth 5
+            if result.column is not None:
+                best_move = (result.column, result.row, result.powerup)
+                if cache is not None and result.completed and result.depth >= max_depth:
+                    cache.store(board.position_key(True), self.config, result.depth, result.column, result.score)
+            return best_move
+        except TimeoutError:
+            return self.medium_move(board, gravity_off) + (None,)
+
+    def expert_move(self, board, gravity_off=False, column_remover=False):
+        """Expert difficulty: Monte Carlo tree search over drops and the power-ups the AI holds"""
+        # Wins, blocks and double threats with a plain drop need no search
+        move = self.forced_move(board)
+        if move is not None:
+            return move[0], None, None
+
+        self.mcts.think_time = self.think_time
+        result = self.mcts.search(board, gravity_off, column_remover)
+        stats = self.searcher.stats
+        if stats is not None:
+            stats.nodes += result.nodes
+            stats.playouts += result.playouts
+            stats.depth = result.depth
+        if result.move[0] is None:
+            return self.easy_move(board) + (None,)
+        return result.move
@@ -0,0 +1,101 @@
+import multiprocessing
+import signal
+
+import numpy as np
+
+from engine import Engine
+
+
+def _engine_loop(conn):
+    """Body of the engine process: answer move requests until the pipe closes
+
+    Requests are (request_id, kind, snapshot) with snapshot = (config,
+    think_time, cells, difficulty, column_remover, gravity_off, collect_stats,
+    position_cache, mcts_settings, table_size), where cells is the board as
+    int8 bytes, position_cache the cache file or None, mcts_settings the Expert
+    search's (exploration, max_playouts, playout_batch) and table_size the
+    transposition table's entries. A 'move' request is answered with
+    (request_id, (col, row, powerup), stats), stats being a SearchStats or
+    None. A 'ponder' request searches the player's likely replies until the
+    next request arrives and is not answered. A 'stop' request, with no
+    snapshot, only ends pondering.
+    """
+    engine = None
+    while True:
+        try:
+            request_id, kind, snapshot = conn.recv()
+        except (EOFError, OSError):
+            return
+        if kind == 'stop':
+            continue
+        (config, think_time, cells, difficulty, column_remover, gravity_off, collect_stats, position_cache,
+         mcts_settings, table_size) = snapshot
+        if engine is None or engine.config != config or engine.table_size != table_size:
+            if engine is not None:
+                engine.close()
+            engine = Engine(config, think_time, table_size)
+        engine.think_time = think_time
+        engine.collect_stats = collect_stats
+        engine.mcts.exploration, engine.mcts.max_playouts, engine.mcts.playout_batch = mcts_settings
+        engine.open_position_cache(position_cache)
+        board = engine.board_from_array(np.frombuffer(cells, dtype=np.int8).reshape(config.rows, config.cols))
+        if kind == 'ponder':
+            try:
+                engine.ponder(board, conn.poll)
+            except (EOFError, OSError):
+                return
+            continue
+        move = engine.choose_move(board, difficulty, column_remover, gravity_off)
+        conn.send((request_id, move, engine.searcher.stats))
+
+
+class EngineProcess:
+    """AI move selection in a separate process, so the search never holds the UI's GIL
+
+    The game sends a compact snapshot of the position over a pipe and polls for
+    the answer once per frame. The engine process keeps its Engine between
+    moves, so the transposition table survives, and builds a new one when the
+    board size changes.
+    """
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_engine_loop, args=(child_conn,), daemon=True)
+        # SDL turns SIGTERM into a quit event, and a forked engine would inherit that
+        # handler and survive terminate(), so start it with the default one
+        handler = signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            self.process.start()
+        finally:
+            signal.signal(signal.SIGTERM, handler)
+        child_conn.close()
+        self.request_id = 0
+        self.last_stats = None  # SearchStats sent with the last answer, if the request asked for them
+
+    def request(self, snapshot):
+        """Start searching a position; any answer still pending for an older one is dropped"""
+        self.request_id += 1
+        self.conn.send((self.request_id, 'move', snapshot))
+
+    def ponder(self, snapshot):
+        """Search ahead on the player's turn; the next request() interrupts it"""
+        self.conn.send((self.request_id, 'ponder', snapshot))
+
+    def stop(self):
+        """End pondering without asking for a move"""
+        self.conn.send((self.request_id, 'stop', None))
+
+    def poll(self):
+        """The move for the latest request if it has arrived, otherwise None; never blocks"""
+        while self.conn.poll():
+            request_id, move, stats = self.conn.recv()
+            if request_id == self.request_id:
+                self.last_stats = stats
+                return move
+        return None
+
+    def close(self):
+        # The engine may be in the middle of a search, so don't wait for it
+        self.conn.close()
+        self.process.terminate()
+        self.process.join()
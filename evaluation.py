@@ -0,0 +1,146 @@
+import functools
+
+import numpy as np
+
+from geometry import get_geometry
+
+
+def window_score(own, opp, empty, connect_n):
+    """Score of one window for the side with `own` pieces in it, from the counts alone"""
+    score = 0
+
+    if own == connect_n:
+        score += 1000000  # Winning move
+    elif own == connect_n - 1 and empty == 1:
+        score += 50000  # Almost winning (n-1 in a row)
+    elif own == connect_n - 2 and empty == 2:
+        score += 10000  # n-2 in a row
+    elif own == connect_n - 3 and empty == 3:
+        score += 1000   # n-3 in a row
+    elif own == connect_n - 4 and empty == 4:
+        score += 100    # n-4 in a row
+    elif own >= 3:
+        score += 10     # 3 in a row
+    elif own >= 2:
+        score += 2      # 2 in a row
+
+    if opp == connect_n - 1 and empty == 1:
+        score -= 50000  # Block opponent's almost win
+    elif opp == connect_n - 2 and empty == 2:
+        score -= 10000  # Block opponent's n-2 in a row
+
+    return score
+
+
+@functools.lru_cache(maxsize=None)
+def score_table(connect_n):
+    """Window scores indexed by own * (connect_n + 1) + opp"""
+    table = np.zeros((connect_n + 1) * (connect_n + 1), dtype=np.int64)
+    for own in range(connect_n + 1):
+        for opp in range(connect_n + 1 - own):
+            table[own * (connect_n + 1) + opp] = window_score(own, opp, connect_n - own - opp, connect_n)
+    return table
+
+
+class WindowEvaluator:
+    """Vectorized score_position: every window is counted and scored in one NumPy pass"""
+
+    def __init__(self, rows, cols, connect_n, player_piece=1, ai_piece=2):
+        self.rows = rows
+        self.cols = cols
+        self.connect_n = connect_n
+        self.geometry = get_geometry(rows, cols, connect_n)
+        self.windows = self.geometry.windows
+        self.table = score_table(connect_n)
+        self.center_cols = [c for c in (cols // 2 - 1, cols // 2) if 0 <= c < cols]
+        # Center column bonus of a piece on each flat cell
+        self.center_bonus = np.zeros(rows * cols, dtype=np.int64)
+        self.center_bonus.reshape(rows, cols)[:, self.center_cols] = 3
+
+        # Cells of each window and windows through each cell, for incremental updates
+        self.window_cells = self.geometry.window_cells
+        self.cell_windows = self.geometry.cell_windows
+
+        # Cell value -> contribution to the combined (own, opp) code of a window
+        self.weights = {}
+        for piece, opp_piece in ((player_piece, ai_piece), (ai_piece, player_piece)):
+            weights = np.zeros(3, dtype=np.intp)
+            weights[piece] = connect_n + 1
+            weights[opp_piece] = 1
+            self.weights[piece] = weights
+
+    def window_codes(self, board, piece):
+        """own * (connect_n + 1) + opp for every window"""
+        cells = np.asarray(board, dtype=np.intp)
+        return self.weights[piece][cells.ravel()[self.windows]].sum(axis=1)
+
+    def score(self, board, piece):
+        cells = np.asarray(board, dtype=np.intp)
+        score = int(self.table[self.window_codes(cells, piece)].sum())
+
+        # Score center columns
+        center = cells[:, self.center_cols]
+        score += int((center == piece).sum()) * 3
+        return score
+
+
+class EvalState:
+    """Running score_position value for one piece, kept in sync one placement at a time
+
+    The combined (own, opp) code of every window is stored, so placing or removing
+    a piece only rescores the windows through that cell.
+    """
+
+    def __init__(self, evaluator, piece, board=None):
+        self.evaluator = evaluator
+        self.piece = piece
+        self.table = evaluator.table.tolist()
+        self.weights = evaluator.weights[piece].tolist()
+        self.cell_windows = evaluator.cell_windows
+        self.center_bonus = evaluator.center_bonus.tolist()
+        if board is None:
+            self.codes = [0] * len(evaluator.windows)
+            # Empty windows can score too, e.g. n-4 own pieces with 4 empty for connect_n=4
+            self.score = self.table[0] * len(evaluator.windows)
+        else:
+            self.codes = evaluator.window_codes(board, piece).tolist()
+            self.score = evaluator.score(board, piece)
+
+    def copy(self):
+        other = EvalState.__new__(EvalState)
+        other.__dict__.update(self.__dict__)
+        other.codes = self.codes[:]
+        return other
+
+    def add(self, cell, piece):
+        """Account for a piece placed on a flat cell index (row * cols + col)"""
+        step = self.weights[piece]
+        codes = self.codes
+        table = self.table
+        delta = 0
+        for window in self.cell_windows[cell]:
+            code = codes[window]
+            codes[window] = code + step
+            delta += table[code + step] - table[code]
+        if piece == self.piece:
+            delta += self.center_bonus[cell]
+        self.score += delta
+
+    def remove(self, cell, piece):
+        """Account for a piece taken off a flat cell index"""
+        step = self.weights[piece]
+        codes = self.codes
+        table = self.table
+        delta = 0
+        for window in self.cell_windows[cell]:
+            code = codes[window]
+            codes[window] = code - step
+            delta += table[code - step] - table[code]
+        if piece == self.piece:
+            delta -= self.center_bonus[cell]
+        self.score += delta
+
+
+@functools.lru_cache(maxsize=None)
+def get_evaluator(rows, cols, connect_n, player_piece=1, ai_piece=2):
+    return WindowEvaluator(rows, cols, connect_n, player_piece, ai_piece)
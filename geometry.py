@@ -0,0 +1,65 @@
+import functools
+
+import numpy as np
+
+
+class Geometry:
+    """Every connect-n window of one board size, computed once and shared
+
+    Cells are flat indices (row * cols + col). Win checks and evaluators index
+    these arrays instead of walking the four nested window loops each call.
+    """
+
+    def __init__(self, rows, cols, connect_n):
+        self.rows = rows
+        self.cols = cols
+        self.connect_n = connect_n
+
+        # Cells of every window, in the order score_position walks them:
+        # horizontal, vertical, positive diagonal, negative diagonal
+        steps = np.arange(connect_n)
+        windows = []
+        for r in range(rows):
+            for c in range(cols - connect_n + 1):
+                windows.append(r * cols + c + steps)
+        for c in range(cols):
+            for r in range(rows - connect_n + 1):
+                windows.append((r + steps) * cols + c)
+        for r in range(rows - connect_n + 1):
+            for c in range(cols - connect_n + 1):
+                windows.append((r + steps) * cols + c + steps)
+        for r in range(connect_n - 1, rows):
+            for c in range(cols - connect_n + 1):
+                windows.append((r - steps) * cols + c + steps)
+        if windows:
+            self.windows = np.array(windows, dtype=np.intp)  # (windows, connect_n)
+        else:
+            self.windows = np.zeros((0, connect_n), dtype=np.intp)
+        self.window_cells = self.windows.tolist()
+
+        # Windows passing through each cell, for incremental updates
+        cell_windows = [[] for _ in range(rows * cols)]
+        for index, window in enumerate(self.window_cells):
+            for cell in window:
+                cell_windows[cell].append(index)
+        self.cell_windows = [tuple(indices) for indices in cell_windows]
+        # The same, as index arrays into windows for vectorized checks
+        self.cell_window_arrays = [self.windows[list(indices)] for indices in cell_windows]
+
+    def key(self):
+        return (self.rows, self.cols, self.connect_n)
+
+    def has_line(self, board, piece):
+        """Whether piece fills any window of a (rows, cols) board"""
+        cells = np.asarray(board).ravel()
+        return bool((cells[self.windows] == piece).all(axis=1).any())
+
+    def line_through(self, board, row, col, piece):
+        """Whether piece fills a window through (row, col); only those windows are read"""
+        cells = np.asarray(board).ravel()
+        return bool((cells[self.cell_window_arrays[row * self.cols + col]] == piece).all(axis=1).any())
+
+
+@functools.lru_cache(maxsize=None)
+def get_geometry(rows, cols, connect_n):
+    return Geometry(rows, cols, connect_n)
@@ -1,14 +1,20 @@
 import pygame
 import numpy as np
 import random
-import math
 import sys
 import time
 from pygame import gfxdraw
 import threading
+import json
+import functools
+import os
 
-# Initialize Pygame
-pygame.init()
+from bitboard import BitBoard
+from engine import BoardConfig, Engine
+from engine_process import EngineProcess
+from evaluation import EvalState, get_evaluator
+from geometry import get_geometry
+from opening_book import book_path
 
 # Default Game Constants
 DEFAULT_ROWS = 10
@@ -31,29 +37,65 @@ LIGHT_GREEN = (144, 238, 144)  # Light green for column hover
 PURPLE = (148, 0, 211)  # Purple for gravity off mode
 
 # Animation Constants
-DROP_ANIMATION_SPEED = 20  # Speed of piece dropping animation
+DROP_ANIMATION_SPEED = 20 * 60  # Speed of piece dropping animation, pixels per second
+AI_MOVE_DELAY = 0.3  # Seconds between the AI deciding and its piece dropping
+GAME_OVER_DELAY = 1.0  # Seconds the final board stays up before the game over screen
 
-# Load fonts
-pygame.font.init()
-FONT = pygame.font.SysFont('Arial', 18)
-MEDIUM_FONT = pygame.font.SysFont('Arial', 24)
-LARGE_FONT = pygame.font.SysFont('Arial', 36)
-TITLE_FONT = pygame.font.SysFont('Arial', 48, bold=True)  # Reduced from 60 to fit better
+# Fonts, loaded by init_display
+FONT = None
+MEDIUM_FONT = None
+LARGE_FONT = None
+TITLE_FONT = None
 
 # Game Settings
 CONNECT_N = 8  # Default, always 8 now
 GRAVITY_MODE = True
 MAX_AI_THINK_TIME = 3.0
+TRANSPOSITION_TABLE_SIZE = 1 << 18  # Positions remembered by the AI search
+DEBUG_SEARCH = False  # Print search statistics after every AI move
+LOG_SEARCH_NODES = False  # Print node counts per ply for every iterative deepening depth
+AI_WORKERS = 1  # Processes used by Hard mode; more than 1 splits the root moves across a process pool
+ENGINE_MODE = 'thread'  # 'thread' searches in a background thread, 'process' in a separate engine process
+PROFILE_FRAMES = False  # Print frame time percentiles while the AI was thinking, after every AI move
+SEARCH_STATS = False  # Collect search statistics for every AI move and show them in a debug overlay
+DIRTY_UPDATES = True  # Redraw only screen areas that changed and skip frames where nothing did; False redraws everything
+SEARCH_STATS_LOG = None  # File every AI move's search statistics are appended to as JSON lines, e.g. 'search_stats.jsonl'
+POSITION_CACHE = None  # File Hard search results are kept in across games, e.g. 'position_cache.bin'
+PONDER = True  # In Hard mode, search the AI's answers to likely player moves while the player thinks (engine process only)
+PONDER_IN_THREAD = False  # Also ponder with ENGINE_MODE = 'thread'; the ponder thread holds the GIL and stalls frames on the player's turn
+MCTS_EXPLORATION = 1.4  # UCT exploration constant of Expert mode's Monte Carlo tree search
+MCTS_PLAYOUTS = None  # Playouts per Expert move, or None to search for MAX_AI_THINK_TIME
+MCTS_PLAYOUT_BATCH = None  # Expert leaves played out together in NumPy, e.g. 256; None plays them one by one
 
 # Global variables for board dimensions
 ROWS = DEFAULT_ROWS
 COLS = DEFAULT_COLS
 WIDTH = COLS * SQUARE_SIZE
 HEIGHT = (ROWS + 1) * SQUARE_SIZE + 100  # Extra space for UI elements
+GEOMETRY = get_geometry(ROWS, COLS, CONNECT_N)  # Window index of the board, rebuilt when custom_grid_menu resizes it
 
-# Initialize screen with default dimensions
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Connect8.AI')
+# Window surface, opened by init_display
+screen = None
+
+def init_display():
+    """Initialize pygame, load fonts and open the window
+    
+    Kept out of import time so the AI (engine.py) and tools that import this
+    module don't pay for display and font startup.
+    """
+    global screen, FONT, MEDIUM_FONT, LARGE_FONT, TITLE_FONT
+    pygame.init()
+    
+    # Load fonts
+    pygame.font.init()
+    FONT = pygame.font.SysFont('Arial', 18)
+    MEDIUM_FONT = pygame.font.SysFont('Arial', 24)
+    LARGE_FONT = pygame.font.SysFont('Arial', 36)
+    TITLE_FONT = pygame.font.SysFont('Arial', 48, bold=True)  # Reduced from 60 to fit better
+    
+    # Initialize screen with default dimensions
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Connect8.AI')
 
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color, text_color=WHITE):
@@ -142,6 +184,177 @@ class PowerUp:
     def deactivate(self):
         self.active = False
 
+class FrameStats:
+    """Frame times in milliseconds, summarized as percentiles"""
+    def __init__(self):
+        self.frame_times = []
+        
+    def record(self, milliseconds):
+        self.frame_times.append(milliseconds)
+        
+    def reset(self):
+        self.frame_times = []
+        
+    def percentiles(self):
+        if not self.frame_times:
+            return {}
+        times = np.array(self.frame_times, dtype=float)
+        return {
+            'frames': len(times),
+            'p50': float(np.percentile(times, 50)),
+            'p95': float(np.percentile(times, 95)),
+            'p99': float(np.percentile(times, 99)),
+            'max': float(times.max()),
+        }
+        
+    def summary(self):
+        stats = self.percentiles()
+        if not stats:
+            return "no frames"
+        return (f"{stats['frames']} frames, p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms, "
+                f"p99 {stats['p99']:.1f} ms, max {stats['max']:.1f} ms")
+
+@functools.lru_cache(maxsize=None)
+def cell_sprite(piece):
+    """One cell's hole (0) or piece (1, 2) on a transparent square, drawn once"""
+    sprite = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+    center = (SQUARE_SIZE // 2, SQUARE_SIZE // 2)
+    if piece == 0:  # Empty spot - blue circle
+        pygame.draw.circle(sprite, BLUE, center, RADIUS)
+    elif piece == 1:  # Player piece (red)
+        pygame.draw.circle(sprite, RED, center, RADIUS)
+        # Add small dot in center for decoration as in the image
+        pygame.draw.circle(sprite, (255, 150, 150), center, RADIUS//6)
+    elif piece == 2:  # AI piece (yellow)
+        pygame.draw.circle(sprite, YELLOW, center, RADIUS)
+        # Add small dot in center for decoration as in the image
+        pygame.draw.circle(sprite, (255, 240, 150), center, RADIUS//6)
+    return sprite
+
+@functools.lru_cache(maxsize=None)
+def hover_sprite(color):
+    """Translucent piece shown under the mouse"""
+    sprite = pygame.Surface((RADIUS*2+4, RADIUS*2+4), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (*pygame.Color(color)[:3], 180), (RADIUS+2, RADIUS+2), RADIUS)
+    return sprite
+
+class BoardSurface:
+    """The board with its holes and pieces, kept on one surface between frames
+
+    update() redraws only the cells whose value changed since the last frame,
+    so a frame costs one blit instead of a circle per cell. Hover overlays are
+    allocated once here and reused.
+    """
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.surface = pygame.Surface((cols * SQUARE_SIZE, rows * SQUARE_SIZE))
+        self.surface.fill(BOARD_COLOR)
+        self.drawn = np.full((rows, cols), -1)  # Cell values currently on the surface, -1 = not drawn yet
+        self.column_overlay = pygame.Surface((SQUARE_SIZE, rows * SQUARE_SIZE), pygame.SRCALPHA)
+        self.column_overlay.fill((0, 255, 0, 50))  # Light green with transparency
+        self.cell_overlay = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+        self.cell_overlay.fill((148, 0, 211, 80))  # Purple with transparency
+        self.remove_text = FONT.render("✖", True, WHITE)
+    
+    def update(self, board):
+        changed = self.drawn != board
+        for r, c in zip(*np.nonzero(changed)):
+            cell = (c * SQUARE_SIZE, r * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+            self.surface.fill(BOARD_COLOR, cell)
+            self.surface.blit(cell_sprite(int(board[r][c])), cell)
+        self.drawn[changed] = board[changed]
+
+class DirtyRegions:
+    """Screen areas that changed since the last frame, so only those are redrawn and updated
+
+    Every frame each layer of the screen is tracked with a key describing how it
+    looks and the rectangles it covers. When a key changes, the rectangles it
+    covered and now covers are both marked; mark() adds a rectangle directly.
+    Frames with nothing marked are skipped entirely.
+    """
+    def __init__(self):
+        self.layers = {}  # name -> (key, rects) as last drawn
+        self.rects = []
+        self.full = True  # Redraw the whole window, e.g. on the first frame or after another screen
+    
+    def mark(self, rect):
+        self.rects.append(pygame.Rect(rect))
+    
+    def mark_all(self):
+        self.full = True
+    
+    def track(self, name, key, rects=()):
+        previous = self.layers.get(name)
+        if previous is not None and previous[0] == key:
+            return
+        if previous is not None:
+            self.rects.extend(previous[1])
+        rects = [pygame.Rect(rect) for rect in rects]
+        self.rects.extend(rects)
+        self.layers[name] = (key, rects)
+    
+    def begin(self, screen):
+        """Clip drawing to the changed area; False means nothing changed and the frame can be skipped"""
+        if self.full:
+            screen.set_clip(None)
+            return True
+        if not self.rects:
+            return False
+        screen.set_clip(self.rects[0].unionall(self.rects[1:]))
+        return True
+    
+    def flush(self, screen):
+        """Show what begin() allowed to be drawn"""
+        screen.set_clip(None)
+        if self.full:
+            pygame.display.update()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.rects = []
+        self.full = False
+
+class Scheduler:
+    """Wall-clock frame timing for animations and delayed actions
+    
+    tick() is called once per frame: it measures the time since the previous
+    frame, so animations move by elapsed time rather than by frames, and runs
+    the timers that are due. Timers replace blocking waits, so the game loop
+    keeps handling input while they run.
+    """
+    def __init__(self):
+        self.now = time.perf_counter()
+        self.dt = 0.0  # Seconds since the previous tick
+        self.timers = {}  # name -> (due time, callback or None)
+    
+    def tick(self):
+        now = time.perf_counter()
+        self.dt = now - self.now
+        self.now = now
+        for name, (due, callback) in list(self.timers.items()):
+            if callback is not None and due <= now:
+                del self.timers[name]
+                callback()
+        return self.dt
+    
+    def after(self, delay, name, callback=None):
+        """Call callback delay seconds from now; without one, poll the timer with expired()"""
+        self.timers[name] = (self.now + delay, callback)
+    
+    def pending(self, name):
+        return name in self.timers
+    
+    def expired(self, name):
+        """True once a timer without a callback has run out; it is removed then"""
+        timer = self.timers.get(name)
+        if timer is None or timer[0] > self.now:
+            return False
+        del self.timers[name]
+        return True
+    
+    def clear(self):
+        self.timers = {}
+
 class AnimatedPiece:
     def __init__(self, col, row, piece, start_y=0):
         self.col = col
@@ -150,28 +363,24 @@ class AnimatedPiece:
         self.piece = piece
         self.done = False
         
-    def update(self):
+    def update(self, dt):
+        """Fall for dt seconds"""
         target_y = (self.target_row + 1) * SQUARE_SIZE + SQUARE_SIZE / 2
         if self.current_y < target_y:
-            self.current_y += DROP_ANIMATION_SPEED
+            self.current_y += DROP_ANIMATION_SPEED * dt
             if self.current_y >= target_y:
                 self.current_y = target_y
                 self.done = True
         else:
             self.done = True
             
+    def rect(self):
+        """Screen area the piece covers at its current height"""
+        return pygame.Rect(self.col * SQUARE_SIZE, int(self.current_y) - SQUARE_SIZE // 2, SQUARE_SIZE, SQUARE_SIZE)
+    
     def draw(self, screen):
-        x = int(self.col * SQUARE_SIZE + SQUARE_SIZE / 2)
-        y = int(self.current_y)
-        
-        if self.piece == 1:  # Player piece (red)
-            pygame.draw.circle(screen, RED, (x, y), RADIUS)
-            # Add small dot in center for decoration
-            pygame.draw.circle(screen, (255, 150, 150), (x, y), RADIUS//6)
-        elif self.piece == 2:  # AI piece (yellow)
-            pygame.draw.circle(screen, YELLOW, (x, y), RADIUS)
-            # Add small dot in center for decoration
-            pygame.draw.circle(screen, (255, 240, 150), (x, y), RADIUS//6)
+        if self.piece in (1, 2):
+            screen.blit(cell_sprite(self.piece), self.rect())
 
 class Connect8Game:
     def __init__(self):
@@ -208,10 +417,29 @@ class Connect8Game:
         self.lock_player_input = False  # Add a lock to prevent player moves during AI turn
         self.ai_thinking_start_time = 0  # Track when AI started thinking
         self.connect_n = CONNECT_N
+        self.decided_winner = None  # Piece that completed a line, kept in sync with the board
+        self.evaluation = self.new_evaluation()  # Running score_position for the AI, kept in sync with the board
+        self.engine = self.new_engine()  # Headless AI with its search and transposition table
+        self.engine_process = None  # Separate AI process, created when ENGINE_MODE is 'process'
+        self.pondering = False  # The engine is searching ahead on the player's turn
+        self.ponder_thread = None
+        self.ponder_stop = threading.Event()  # Tells the ponder thread to give up its search
+        self.search_stats = None  # SearchStats of the last AI move, when SEARCH_STATS or SEARCH_STATS_LOG is on
+        self.board_surface = None  # BoardSurface drawn by draw_board, created on the first frame
+        self.search_stats_overlay = None  # (stats, surface) drawn by draw_search_stats
+        self.fps_shown = 0  # FPS value on screen, refreshed once a second by mark_dirty
+        self.fps_time = 0
         
     def reset_game(self):
         global ROWS, COLS
+        self.stop_pondering()
         self.board = np.zeros((ROWS, COLS))
+        self.decided_winner = None
+        self.evaluation = self.new_evaluation()
+        self.board_surface = None
+        self.configure_engine()
+        self.engine.reset()
+        self.search_stats = None
         self.turn = 0
         self.game_over = False
         self.winner = None
@@ -238,6 +466,50 @@ class Connect8Game:
             'gravity_off': PowerUp('gravity_off', PURPLE, False)
         }
         
+    def new_evaluation(self):
+        evaluator = get_evaluator(ROWS, COLS, self.connect_n, self.player_piece, self.ai_piece)
+        return EvalState(evaluator, self.ai_piece, self.board)
+    
+    def board_config(self):
+        return BoardConfig(ROWS, COLS, self.connect_n, self.player_piece, self.ai_piece)
+    
+    def new_engine(self):
+        return Engine(self.board_config(), MAX_AI_THINK_TIME, TRANSPOSITION_TABLE_SIZE, AI_WORKERS)
+    
+    def configure_engine(self):
+        """Apply the current board size and AI settings to the engine"""
+        if self.engine.config != self.board_config():
+            self.engine.close()
+            self.engine = self.new_engine()
+        self.engine.think_time = MAX_AI_THINK_TIME
+        self.engine.workers = AI_WORKERS
+        self.engine.searcher.log_nodes = LOG_SEARCH_NODES
+        self.engine.mcts.exploration = MCTS_EXPLORATION
+        self.engine.mcts.max_playouts = MCTS_PLAYOUTS
+        self.engine.mcts.playout_batch = MCTS_PLAYOUT_BATCH
+        self.engine.collect_stats = self.collect_search_stats()
+        self.engine.open_position_cache(POSITION_CACHE)
+    
+    def collect_search_stats(self):
+        return SEARCH_STATS or SEARCH_STATS_LOG is not None
+    
+    def record_search_stats(self, stats):
+        """Keep the last move's search statistics for the overlay and append them to the log"""
+        if stats is None:
+            return
+        self.search_stats = stats
+        if SEARCH_STATS_LOG is not None:
+            record = {'time': time.time(), 'difficulty': self.ai_difficulty, 'rows': ROWS, 'cols': COLS}
+            record.update(stats.as_dict())
+            with open(SEARCH_STATS_LOG, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+    
+    def search_board(self):
+        """Bitboard copy of the game board, with its own copy of the evaluation state"""
+        if self.evaluation.evaluator.connect_n != self.connect_n:
+            self.evaluation = self.new_evaluation()
+        return BitBoard.from_array(self.board, self.connect_n, self.evaluation.copy())
+    
     def toggle_gravity_mode(self):
         self.gravity_mode = not self.gravity_mode
         self.reset_game()
@@ -256,7 +528,7 @@ class Connect8Game:
                     return True, row
                 else:
                     # Immediate placement without animation
-                    self.board[row][col] = piece
+                    self.set_cell(row, col, piece)
                     self.last_move = (row, col)
                     return True, row
             return False, -1
@@ -271,7 +543,7 @@ class Connect8Game:
                         return True, row
                     else:
                         # Immediate placement without animation
-                        self.board[row][col] = piece
+                        self.set_cell(row, col, piece)
                         self.last_move = (row, col)
                         return True, row
             return False, -1
@@ -286,19 +558,26 @@ class Connect8Game:
                         return True, row
                     else:
                         # Immediate placement without animation
-                        self.board[row][col] = piece
+                        self.set_cell(row, col, piece)
                         self.last_move = (row, col)
                         return True, row
             return False, -1
     
-    def update_animations(self):
-        # Update all animated pieces
+    def set_cell(self, row, col, piece):
+        """Write a piece to the board and update the cached winner from the lines through it"""
+        self.board[row][col] = piece
+        self.evaluation.add(row * COLS + col, piece)
+        if self.decided_winner is None and self.check_win_at(row, col, piece):
+            self.decided_winner = piece
+    
+    def update_animations(self, dt):
+        # Advance every animated piece by the dt seconds since the last frame
         for piece in self.animated_pieces[:]:
-            piece.update()
+            piece.update(dt)
             if piece.done:
                 # When animation is done, update the board
                 if 0 <= piece.target_row < ROWS and 0 <= piece.col < COLS:
-                    self.board[piece.target_row][piece.col] = piece.piece
+                    self.set_cell(piece.target_row, piece.col, piece.piece)
                     
                     # Check for win immediately after the piece lands and updates the board
                     if self.check_win(piece.piece):
@@ -343,7 +622,17 @@ class Connect8Game:
         """Remove all pieces from a column"""
         if 0 <= col < COLS:
             for row in range(ROWS):
-                self.board[row][col] = 0
+                if self.board[row][col] != 0:
+                    self.evaluation.remove(row * COLS + col, int(self.board[row][col]))
+                    self.board[row][col] = 0
+            self.board_surface = None
+            # Removing pieces can break a line, so rescan once
+            if self.scan_win(self.ai_piece):
+                self.decided_winner = self.ai_piece
+            elif self.scan_win(self.player_piece):
+                self.decided_winner = self.player_piece
+            else:
+                self.decided_winner = None
             return True
         return False
     
@@ -380,411 +669,176 @@ class Connect8Game:
         return False, None
     
     def check_win(self, piece):
-        # Check horizontal
-        for r in range(ROWS):
-            for c in range(COLS - self.connect_n + 1):
-                window = [self.board[r][c+i] for i in range(self.connect_n)]
-                if all(cell == piece for cell in window):
-                    return True
-        
-        # Check vertical
-        for c in range(COLS):
-            for r in range(ROWS - self.connect_n + 1):
-                window = [self.board[r+i][c] for i in range(self.connect_n)]
-                if all(cell == piece for cell in window):
-                    return True
-        
-        # Check diagonal (positive slope)
-        for r in range(ROWS - self.connect_n + 1):
-            for c in range(COLS - self.connect_n + 1):
-                window = [self.board[r+i][c+i] for i in range(self.connect_n)]
-                if all(cell == piece for cell in window):
-                    return True
-        
-        # Check diagonal (negative slope)
-        for r in range(self.connect_n - 1, ROWS):
-            for c in range(COLS - self.connect_n + 1):
-                window = [self.board[r-i][c+i] for i in range(self.connect_n)]
-                if all(cell == piece for cell in window):
-                    return True
+        # The cached state is updated whenever a piece lands, so this is O(1)
+        return self.decided_winner == piece
     
-        return False
+    def geometry(self):
+        """Window index of the current board size, see geometry.py"""
+        if GEOMETRY.key() == (ROWS, COLS, self.connect_n):
+            return GEOMETRY
+        return get_geometry(ROWS, COLS, self.connect_n)
+    
+    def check_win_at(self, row, col, piece, board=None):
+        """Check only the windows through (row, col) for connect-n"""
+        if board is None:
+            board = self.board
+        return self.geometry().line_through(board, row, col, piece)
+    
+    def scan_win(self, piece):
+        """Full-board win check, only needed after pieces are removed"""
+        return self.geometry().has_line(self.board, piece)
     
     def is_terminal_node(self):
-        return self.check_win(self.player_piece) or self.check_win(self.ai_piece) or len(self.get_valid_locations()) == 0
+        return self.decided_winner is not None or len(self.get_valid_locations()) == 0
+    
+    def decide_ai_move(self):
+        """Pick the AI's action on the current board without changing it
+        
+        Returns (col, row, powerup): row is set for gravity off placements, and
+        powerup is 'column_remover' when the AI wants to clear column col.
+        """
+        self.configure_engine()
+        move = self.engine.choose_move(self.search_board(), self.ai_difficulty,
+                                       self.ai_powerups['column_remover'].active,
+                                       self.ai_powerups['gravity_off'].active)
+        self.record_search_stats(self.engine.searcher.stats)
+        if DEBUG_SEARCH:
+            if self.ai_difficulty == 'expert':
+                print(self.engine.mcts.last_result)
+            elif self.engine.last_search is not None:
+                print(self.engine.last_search)
+            print(self.engine.searcher.transposition_table.summary())
+        return move
     
-    def evaluate_window(self, window, piece):
-        score = 0
-        opp_piece = self.player_piece if piece == self.ai_piece else self.ai_piece
+    def play_ai_move(self, col, row=None):
+        """Drop the AI's chosen piece, or place it when it holds gravity off and chose a row"""
+        # For gravity off mode with AI
+        if row is not None and self.ai_powerups['gravity_off'].active:
+            success, _ = self.drop_piece(col, self.ai_piece, row, True)
+            # Consume the gravity off powerup after use
+            self.ai_powerups['gravity_off'].deactivate()
+        else:
+            success, _ = self.drop_piece(col, self.ai_piece)
         
-        if window.count(piece) == self.connect_n:
-            score += 1000000  # Winning move
-        elif window.count(piece) == self.connect_n - 1 and window.count(0) == 1:
-            score += 50000  # Almost winning (n-1 in a row)
-        elif window.count(piece) == self.connect_n - 2 and window.count(0) == 2:
-            score += 10000  # n-2 in a row
-        elif window.count(piece) == self.connect_n - 3 and window.count(0) == 3:
-            score += 1000   # n-3 in a row
-        elif window.count(piece) == self.connect_n - 4 and window.count(0) == 4:
-            score += 100    # n-4 in a row
-        elif window.count(piece) >= 3:
-            score += 10     # 3 in a row
-        elif window.count(piece) >= 2:
-            score += 2      # 2 in a row
+        if success:
+            if self.check_win(self.ai_piece):
+                self.game_over = True
+                self.winner = 2
             
-        if window.count(opp_piece) == self.connect_n - 1 and window.count(0) == 1:
-            score -= 50000  # Block opponent's almost win
-        elif window.count(opp_piece) == self.connect_n - 2 and window.count(0) == 2:
-            score -= 10000  # Block opponent's n-2 in a row
-        
-        return score
+            # Check for powerup after a move
+            self.check_for_powerup()
+        self.end_ai_turn()
     
-    def score_position(self, piece):
-        score = 0
-        
-        # Score center columns
-        center_cols = [COLS // 2 - 1, COLS // 2]
-        for center_col in center_cols:
-            center_array = [int(self.board[r][center_col]) for r in range(ROWS)]
-            center_count = center_array.count(piece)
-            score += center_count * 3
-        
-        # Score all possible windows
-        # Horizontal windows
-        for r in range(ROWS):
-            for c in range(COLS - self.connect_n + 1):
-                window = [int(self.board[r][c+i]) for i in range(self.connect_n)]
-                score += self.evaluate_window(window, piece)
-        
-        # Vertical windows
-        for c in range(COLS):
-            for r in range(ROWS - self.connect_n + 1):
-                window = [int(self.board[r+i][c]) for i in range(self.connect_n)]
-                score += self.evaluate_window(window, piece)
-        
-        # Positive diagonal windows
-        for r in range(ROWS - self.connect_n + 1):
-            for c in range(COLS - self.connect_n + 1):
-                window = [int(self.board[r+i][c+i]) for i in range(self.connect_n)]
-                score += self.evaluate_window(window, piece)
-        
-        # Negative diagonal windows
-        for r in range(self.connect_n - 1, ROWS):
-            for c in range(COLS - self.connect_n + 1):
-                window = [int(self.board[r-i][c+i]) for i in range(self.connect_n)]
-                score += self.evaluate_window(window, piece)
-        
-        return score
+    def end_ai_turn(self):
+        # Set a flag to switch turn after AI animation completes
+        if not self.animated_pieces:  # If animation completed immediately
+            self.turn = 0  # Switch to player's turn
+            self.lock_player_input = False  # Unlock player input
+        else:
+            self.switch_to_player_after_animation = True
     
-    def minimax(self, depth, alpha, beta, maximizing_player, start_time, sim_board):
-        # Check if we're out of time
-        if time.time() - start_time > MAX_AI_THINK_TIME:
-            raise TimeoutError("AI thinking took too long")
-        
-        # Get valid locations for the simulated board
-        valid_locations = []
-        for col in range(COLS):
-            if col >= 0 and col < COLS and sim_board[0][col] == 0:
-                valid_locations.append(col)
-        
-        # Check for terminal condition in simulated board
-        is_terminal = self.check_win_sim(sim_board, self.player_piece) or \
-                      self.check_win_sim(sim_board, self.ai_piece) or \
-                      len(valid_locations) == 0
-        
-        if depth == 0 or is_terminal:
-            if is_terminal:
-                if self.check_win_sim(sim_board, self.ai_piece):
-                    return (None, 1000000)
-                elif self.check_win_sim(sim_board, self.player_piece):
-                    return (None, -1000000)
-                else:  # Game is over, no more valid moves
-                    return (None, 0)
-            else:  # Depth is zero
-                return (None, self.score_position_sim(sim_board, self.ai_piece))
-        
-        if maximizing_player:
-            value = -math.inf
-            column = random.choice(valid_locations) if valid_locations else None
-            
-            for col in valid_locations:
-                # Make a simulated move using the simulated board
-                sim_board_copy = np.copy(sim_board)
-                row = self.get_next_open_row(sim_board_copy, col)
-                if row != -1:
-                    sim_board_copy[row][col] = self.ai_piece
-                    new_score = self.minimax(depth-1, alpha, beta, False, start_time, sim_board_copy)[1]
-                    
-                    if new_score > value:
-                        value = new_score
-                        column = col
-                    alpha = max(alpha, value)
-                    if alpha >= beta:
-                        break
-            return column, value
-        
-        else:  # Minimizing player
-            value = math.inf
-            column = random.choice(valid_locations) if valid_locations else None
-            
-            for col in valid_locations:
-                # Make a simulated move using the simulated board
-                sim_board_copy = np.copy(sim_board)
-                row = self.get_next_open_row(sim_board_copy, col)
-                if row != -1:
-                    sim_board_copy[row][col] = self.player_piece
-                    new_score = self.minimax(depth-1, alpha, beta, True, start_time, sim_board_copy)[1]
-                    
-                    if new_score < value:
-                        value = new_score
-                        column = col
-                    beta = min(beta, value)
-                    if alpha >= beta:
-                        break
-            return column, value
-    
-    # Helper functions for simulated board operations
-    def check_win_sim(self, board, piece):
-        # Check horizontal
-        for r in range(ROWS):
-            for c in range(COLS - self.connect_n + 1):
-                window = [board[r][c+i] for i in range(self.connect_n)]
-                if all(cell == piece for cell in window):
-                    return True
-        
-        # Check vertical
-        for c in range(COLS):
-            for r in range(ROWS - self.connect_n + 1):
-                window = [board[r+i][c] for i in range(self.connect_n)]
-                if all(cell == piece for cell in window):
-                    return True
-        
-        # Check diagonal (positive slope)
-        for r in range(ROWS - self.connect_n + 1):
-            for c in range(COLS - self.connect_n + 1):
-                window = [board[r+i][c+i] for i in range(self.connect_n)]
-                if all(cell == piece for cell in window):
-                    return True
-        
-        # Check diagonal (negative slope)
-        for r in range(self.connect_n - 1, ROWS):
-            for c in range(COLS - self.connect_n + 1):
-                window = [board[r-i][c+i] for i in range(self.connect_n)]
-                if all(cell == piece for cell in window):
-                    return True
+    def start_pondering(self):
+        """Let the Hard engine search ahead on the player's turn, until stop_pondering or the next move request"""
+        self.pondering = True
+        if not PONDER or self.ai_difficulty != 'hard' or (ENGINE_MODE != 'process' and not PONDER_IN_THREAD):
+            return
+        self.configure_engine()
+        if ENGINE_MODE == 'process':
+            self.get_engine_process().ponder(self.snapshot())
+        else:
+            self.ponder_stop.clear()
+            self.ponder_thread = threading.Thread(target=self.engine.ponder,
+                                                  args=(self.search_board(), self.ponder_stop.is_set))
+            self.ponder_thread.daemon = True
+            self.ponder_thread.start()
     
-        return False
+    def stop_pondering(self):
+        """Stop a ponder thread, or the engine process's pondering, before the engine is used for anything else"""
+        if self.pondering and self.engine_process is not None:
+            self.engine_process.stop()
+        if self.ponder_thread is not None:
+            self.ponder_stop.set()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+        self.pondering = False
     
-    def score_position_sim(self, board, piece):
-        score = 0
-        
-        # Score center columns
-        center_cols = [COLS // 2 - 1, COLS // 2]
-        for center_col in center_cols:
-            if center_col < COLS:  # Make sure center column exists
-                center_array = [int(board[r][center_col]) for r in range(ROWS)]
-                center_count = center_array.count(piece)
-                score += center_count * 3
-        
-        # Score horizontal windows
-        for r in range(ROWS):
-            for c in range(COLS - self.connect_n + 1):
-                window = [int(board[r][c+i]) for i in range(self.connect_n)]
-                score += self.evaluate_window(window, piece)
-        
-        # Score vertical windows
-        for c in range(COLS):
-            for r in range(ROWS - self.connect_n + 1):
-                window = [int(board[r+i][c]) for i in range(self.connect_n)]
-                score += self.evaluate_window(window, piece)
-        
-        # Score positive diagonal windows
-        for r in range(ROWS - self.connect_n + 1):
-            for c in range(COLS - self.connect_n + 1):
-                window = [int(board[r+i][c+i]) for i in range(self.connect_n)]
-                score += self.evaluate_window(window, piece)
-        
-        # Score negative diagonal windows
-        for r in range(self.connect_n - 1, ROWS):
-            for c in range(COLS - self.connect_n + 1):
-                window = [int(board[r-i][c+i]) for i in range(self.connect_n)]
-                score += self.evaluate_window(window, piece)
-        
-        return score
-    
-    def get_next_open_row(self, board, col):
-        for row in range(ROWS-1, -1, -1):
-            if board[row][col] == 0:
-                return row
-        return -1
-    
-    def get_easy_move(self):
-        """Easy difficulty: Random valid move"""
-        # If gravity off is active, choose a random empty cell
-        if self.ai_powerups['gravity_off'].active and random.random() > 0.3:  # 70% chance to use gravity off
-            valid_cells = self.get_valid_cells()
-            if valid_cells:
-                row, col = random.choice(valid_cells)
-                return col, row
-        
-        # Otherwise use regular gravity mode
-        valid_locations = self.get_valid_locations()
-        if valid_locations:
-            return random.choice(valid_locations), None
-        return None, None
-    
-    def get_medium_move(self):
-        """Medium difficulty: Minimax with limited depth (3)"""
-        # If gravity off is active, use it sometimes
-        if self.ai_powerups['gravity_off'].active and random.random() > 0.3:  # 70% chance to use gravity off
-            valid_cells = self.get_valid_cells()
-            if valid_cells:
-                # Try to find strategic places instead of random
-                best_cell = None
-                best_score = -math.inf
-                
-                for row, col in valid_cells:
-                    # Try placing a piece here
-                    sim_board = np.copy(self.board)
-                    sim_board[row][col] = self.ai_piece
-                    score = self.score_position_sim(sim_board, self.ai_piece)
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_cell = (row, col)
-                
-                if best_cell:
-                    return best_cell[1], best_cell[0]  # Return as col, row
-            
-        try:
-            start_time = time.time()
-            # Create a simulation board - don't modify the game board
-            sim_board = np.copy(self.board)
-            col, _ = self.minimax(3, -math.inf, math.inf, True, start_time, sim_board)
-            return col, None
-        except TimeoutError:
-            return self.get_easy_move()
-    
-    def get_hard_move(self):
-        """Hard difficulty: Full Minimax with Alpha-Beta Pruning"""
-        # If gravity off is active, use it strategically
-        if self.ai_powerups['gravity_off'].active and random.random() > 0.2:  # 80% chance to use gravity off
-            valid_cells = self.get_valid_cells()
-            if valid_cells:
-                best_cell = None
-                best_score = -math.inf
-                
-                # Deeply analyze each possible cell
-                for row, col in valid_cells:
-                    sim_board = np.copy(self.board)
-                    sim_board[row][col] = self.ai_piece
-                    
-                    # Check if this is a winning move
-                    if self.check_win_sim(sim_board, self.ai_piece):
-                        return col, row  # Immediate win
-                    
-                    # Check if this blocks a player win
-                    for r, c in valid_cells:
-                        if r != row or c != col:  # Don't check the same cell
-                            test_board = np.copy(self.board)
-                            test_board[r][c] = self.player_piece
-                            if self.check_win_sim(test_board, self.player_piece):
-                                # This is a critical blocking move
-                                return c, r
-                    
-                    score = self.score_position_sim(sim_board, self.ai_piece)
-                    if score > best_score:
-                        best_score = score
-                        best_cell = (row, col)
-                
-                if best_cell:
-                    return best_cell[1], best_cell[0]  # Return as col, row
-        
-        try:
-            start_time = time.time()
-            # Use iterative deepening to ensure we always have a move
-            best_col = random.choice(self.get_valid_locations()) if self.get_valid_locations() else None
-            
-            # Create a simulation board - don't modify the game board
-            sim_board = np.copy(self.board)
-            
-            for current_depth in range(1, 6):  # Up to depth 5
-                try:
-                    col, score = self.minimax(current_depth, -math.inf, math.inf, True, start_time, sim_board)
-                    if col is not None:
-                        best_col = col
-                    
-                    # If we're running out of time, stop deepening
-                    if time.time() - start_time > MAX_AI_THINK_TIME * 0.8:
-                        break
-                except TimeoutError:
-                    break
-            
-            return best_col, None
-        except TimeoutError:
-            return self.get_medium_move()
+    def close(self):
+        """Shut down everything the engine runs besides the UI, when leaving the game"""
+        self.stop_pondering()
+        if self.engine_process is not None:
+            self.engine_process.close()
+            self.engine_process = None
+        self.engine.close()
+    
+    def start_ai_move(self):
+        """Start thinking about the AI's move in the background"""
+        self.stop_pondering()
+        self.ai_thinking = True
+        self.ai_thinking_start_time = time.time()
+        if ENGINE_MODE == 'process':
+            self.get_engine_process().request(self.snapshot())
+        else:
+            ai_thread = threading.Thread(target=self.ai_think_thread)
+            ai_thread.daemon = True
+            ai_thread.start()
+    
+    def poll_ai_move(self):
+        """Pick up the engine process's answer if it has arrived, without blocking the frame"""
+        if self.ai_thinking and ENGINE_MODE == 'process' and self.engine_process is not None:
+            move = self.engine_process.poll()
+            if move is not None:
+                self.ai_move = move
+                self.ai_thinking = False
+                self.record_search_stats(self.engine_process.last_stats)
     
     def ai_think_thread(self):
         """Separate thread for AI thinking to prevent UI freezing"""
         try:
-            self.ai_thinking_start_time = time.time()
-            
-            # Check if AI should use column remover powerup
-            if self.ai_powerups['column_remover'].active and random.random() > 0.5:
-                # Find a column with opponent pieces to remove
-                opponent_columns = []
-                for col in range(COLS):
-                    for row in range(ROWS):
-                        if self.board[row][col] == self.player_piece:
-                            opponent_columns.append(col)
-                            break
-                
-                if opponent_columns:
-                    col = random.choice(opponent_columns)
-                    self.use_powerup('column_remover', col)
-                    self.ai_move = None, None  # AI used powerup
-                    return
-            
-            # Make a regular move or use gravity off
-            if self.ai_difficulty == 'easy':
-                self.ai_move = self.get_easy_move()
-            elif self.ai_difficulty == 'medium':
-                self.ai_move = self.get_medium_move()
-            elif self.ai_difficulty == 'hard':
-                self.ai_move = self.get_hard_move()
-            else:
-                self.ai_move = self.get_easy_move()  # Fallback
-            
-        except Exception as e:
-            print(f"AI thinking error: {e}")
-            # Fallback to random move if there's an error
-            valid_locations = self.get_valid_locations()
-            if valid_locations:
-                self.ai_move = random.choice(valid_locations), None
-            else:
-                self.ai_move = None, None  # No valid moves
+            self.ai_move = self.decide_ai_move()
         finally:
             self.ai_thinking = False
     
+    def get_engine_process(self):
+        if self.engine_process is None:
+            self.engine_process = EngineProcess()
+        return self.engine_process
+    
+    def snapshot(self):
+        """Compact copy of everything decide_ai_move reads, for the engine process"""
+        return (self.board_config(), MAX_AI_THINK_TIME, self.board.astype(np.int8).tobytes(), self.ai_difficulty,
+                self.ai_powerups['column_remover'].active, self.ai_powerups['gravity_off'].active,
+                self.collect_search_stats(), POSITION_CACHE, (MCTS_EXPLORATION, MCTS_PLAYOUTS, MCTS_PLAYOUT_BATCH),
+                TRANSPOSITION_TABLE_SIZE)
+    
+    def get_board_surface(self):
+        """Cached board surface, rebuilt after a reset, a removed column or a resize"""
+        if self.board_surface is None or (self.board_surface.rows, self.board_surface.cols) != (ROWS, COLS):
+            self.board_surface = BoardSurface(ROWS, COLS)
+        return self.board_surface
+    
     def draw_board(self, screen):
-        # Draw the board background
-        pygame.draw.rect(screen, BOARD_COLOR, (0, SQUARE_SIZE, WIDTH, ROWS * SQUARE_SIZE))
+        # Board background, holes and pieces come from the cached surface
+        board_surface = self.get_board_surface()
+        board_surface.update(self.board)
+        screen.blit(board_surface.surface, (0, SQUARE_SIZE))
         
         # Draw column hover effect when column remover is active
         if self.column_remover_active and 0 <= self.hovered_column < COLS:
-            column_surface = pygame.Surface((SQUARE_SIZE, ROWS * SQUARE_SIZE), pygame.SRCALPHA)
-            column_surface.fill((0, 255, 0, 50))  # Light green with transparency
-            screen.blit(column_surface, (self.hovered_column * SQUARE_SIZE, SQUARE_SIZE))
+            x = self.hovered_column * SQUARE_SIZE
+            screen.fill(BOARD_COLOR, (x, SQUARE_SIZE, SQUARE_SIZE, ROWS * SQUARE_SIZE))
+            screen.blit(board_surface.column_overlay, (x, SQUARE_SIZE))
+            # Holes and pieces stay on top of the highlight
+            for r in range(ROWS):
+                screen.blit(cell_sprite(int(self.board[r][self.hovered_column])), (x, (r + 1) * SQUARE_SIZE))
             
             # Draw removal button at the bottom of the column
             button_y = (ROWS + 1) * SQUARE_SIZE
-            button_rect = pygame.Rect(self.hovered_column * SQUARE_SIZE, button_y, SQUARE_SIZE, 30)
+            button_rect = pygame.Rect(x, button_y, SQUARE_SIZE, 30)
             pygame.draw.rect(screen, GREEN, button_rect, border_radius=5)
             pygame.draw.rect(screen, WHITE, button_rect, 1, border_radius=5)
             
-            remove_text = FONT.render("✖", True, WHITE)
-            text_rect = remove_text.get_rect(center=button_rect.center)
-            screen.blit(remove_text, text_rect)
+            text_rect = board_surface.remove_text.get_rect(center=button_rect.center)
+            screen.blit(board_surface.remove_text, text_rect)
         
         # Draw cell hover effect when gravity off mode is active
         if self.gravity_off_active and 0 <= self.hovered_row < ROWS and 0 <= self.hovered_column < COLS:
@@ -794,30 +848,9 @@ class Connect8Game:
                     (self.hovered_row + 1) * SQUARE_SIZE, 
                     SQUARE_SIZE, SQUARE_SIZE
                 )
-                cell_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-                cell_surface.fill((148, 0, 211, 80))  # Purple with transparency
-                screen.blit(cell_surface, cell_rect)
-        
-        # Draw circles for empty spots and pieces
-        for c in range(COLS):
-            for r in range(ROWS):
-                # Calculate center position
-                x = int(c * SQUARE_SIZE + SQUARE_SIZE / 2)
-                y = int((r + 1) * SQUARE_SIZE + SQUARE_SIZE / 2)
-                
-                # Draw pieces with a clean look matching the image
-                if self.board[r][c] == 0:  # Empty spot - blue circle
-                    pygame.draw.circle(screen, BLUE, (x, y), RADIUS)
-                    
-                elif self.board[r][c] == 1:  # Player piece (red)
-                    pygame.draw.circle(screen, RED, (x, y), RADIUS)
-                    # Add small dot in center for decoration as in the image
-                    pygame.draw.circle(screen, (255, 150, 150), (x, y), RADIUS//6)
-                    
-                elif self.board[r][c] == 2:  # AI piece (yellow)
-                    pygame.draw.circle(screen, YELLOW, (x, y), RADIUS)
-                    # Add small dot in center for decoration as in the image
-                    pygame.draw.circle(screen, (255, 240, 150), (x, y), RADIUS//6)
+                screen.fill(BOARD_COLOR, cell_rect)
+                screen.blit(board_surface.cell_overlay, cell_rect)
+                screen.blit(cell_sprite(0), cell_rect)
         
         # Draw animated pieces
         for piece in self.animated_pieces:
@@ -830,25 +863,26 @@ class Connect8Game:
             y = int((r + 1) * SQUARE_SIZE + SQUARE_SIZE / 2)
             pygame.draw.circle(screen, WHITE, (x, y), RADIUS + 3, 2)
     
-    def draw_hover_piece(self, screen, col, row=None):
+    def hover_piece(self, col, row=None):
+        """(top-left, color) of the translucent piece under the mouse, or None"""
         if self.gravity_off_active and row is not None:
             # Gravity off mode - show piece at mouse hover position
             if 0 <= col < COLS and 0 <= row < ROWS and self.board[row][col] == 0:
                 x = int(col * SQUARE_SIZE + SQUARE_SIZE / 2)
                 y = int((row + 1) * SQUARE_SIZE + SQUARE_SIZE / 2)
-                piece_color = RED if self.turn == 0 else YELLOW
-                # Draw with transparency for hover effect
-                s = pygame.Surface((RADIUS*2+4, RADIUS*2+4), pygame.SRCALPHA)
-                pygame.draw.circle(s, (*pygame.Color(piece_color)[:3], 180), (RADIUS+2, RADIUS+2), RADIUS)
-                screen.blit(s, (x-RADIUS-2, y-RADIUS-2))
+                return (x-RADIUS-2, y-RADIUS-2), (RED if self.turn == 0 else YELLOW)
         elif 0 <= col < COLS and not self.game_over and not self.column_remover_active and not self.lock_player_input:
             # Regular mode - show piece at top of column
             x = int(col * SQUARE_SIZE + SQUARE_SIZE / 2)
-            piece_color = RED if self.turn == 0 else YELLOW
+            return (x-RADIUS-2, SQUARE_SIZE//2-RADIUS-2), (RED if self.turn == 0 else YELLOW)
+        return None
+    
+    def draw_hover_piece(self, screen, col, row=None):
+        hover = self.hover_piece(col, row)
+        if hover is not None:
+            position, piece_color = hover
             # Draw with transparency for hover effect
-            s = pygame.Surface((RADIUS*2+4, RADIUS*2+4), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*pygame.Color(piece_color)[:3], 180), (RADIUS+2, RADIUS+2), RADIUS)
-            screen.blit(s, (x-RADIUS-2, SQUARE_SIZE//2-RADIUS-2))
+            screen.blit(hover_sprite(piece_color), position)
     
     def draw_notification(self, screen):
         # Display powerup notification with simple styling in the top-left corner
@@ -991,6 +1025,85 @@ class Connect8Game:
         
         # Draw notification for powerups
         self.draw_notification(screen)
+        
+        if SEARCH_STATS and self.search_stats is not None:
+            self.draw_search_stats(screen)
+    
+    def draw_search_stats(self, screen):
+        """Debug overlay with the last AI move's search statistics"""
+        overlay = self.search_stats_surface()
+        screen.blit(overlay, (WIDTH - overlay.get_width() - 5, SQUARE_SIZE + 5))
+    
+    def search_stats_surface(self):
+        """The search statistics overlay, rendered once per AI move"""
+        if self.search_stats_overlay is None or self.search_stats_overlay[0] is not self.search_stats:
+            lines = [FONT.render(line, True, WHITE) for line in self.search_stats.summary_lines()]
+            width = max(line.get_width() for line in lines) + 20
+            height = len(lines) * 20 + 10
+            overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 160))
+            for i, line in enumerate(lines):
+                overlay.blit(line, (10, 5 + i * 20))
+            self.search_stats_overlay = (self.search_stats, overlay)
+        return self.search_stats_overlay[1]
+    
+    def mark_dirty(self, regions, col, row):
+        """Record in a DirtyRegions what this frame changes on screen, see play_game"""
+        # Cells whose piece changed; a new or resized board surface redraws the whole board
+        board_surface = self.board_surface
+        if board_surface is None or (board_surface.rows, board_surface.cols) != (ROWS, COLS):
+            regions.mark((0, SQUARE_SIZE, WIDTH, ROWS * SQUARE_SIZE))
+        else:
+            for r, c in zip(*np.nonzero(board_surface.drawn != self.board)):
+                regions.mark((c * SQUARE_SIZE, (r + 1) * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        
+        # Falling pieces and the last move ring
+        regions.track('animations', tuple((piece.col, int(piece.current_y), piece.piece) for piece in self.animated_pieces),
+                      [piece.rect() for piece in self.animated_pieces])
+        last_move = self.last_move if self.last_move and not self.animated_pieces else None
+        regions.track('last_move', last_move,
+                      [((last_move[1]) * SQUARE_SIZE, (last_move[0] + 1) * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)]
+                      if last_move else [])
+        
+        # Hover effects
+        hovered_column = self.hovered_column if self.column_remover_active and 0 <= self.hovered_column < COLS else None
+        regions.track('column_hover', hovered_column,
+                      [(hovered_column * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE, ROWS * SQUARE_SIZE + 30)]
+                      if hovered_column is not None else [])
+        hovered_cell = None
+        if self.gravity_off_active and 0 <= self.hovered_row < ROWS and 0 <= self.hovered_column < COLS:
+            if self.board[self.hovered_row][self.hovered_column] == 0:
+                hovered_cell = (self.hovered_row, self.hovered_column)
+        regions.track('cell_hover', hovered_cell,
+                      [(hovered_cell[1] * SQUARE_SIZE, (hovered_cell[0] + 1) * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)]
+                      if hovered_cell else [])
+        hover = None
+        if self.turn == 0 and not self.game_over and not self.lock_player_input:
+            hover = self.hover_piece(col, row if self.gravity_off_active else None)
+        regions.track('hover_piece', hover, [(hover[0], (RADIUS*2+4, RADIUS*2+4))] if hover else [])
+        
+        # Status bar, with the thinking timer and notification drawn around it
+        thinking_time = round(time.time() - self.ai_thinking_start_time, 1) if self.ai_thinking else None
+        notification = None
+        if self.powerup_notification and time.time() - self.powerup_notification_time < 3.0:
+            notification = self.powerup_notification
+        regions.track('status', (self.game_over, self.winner, self.turn, thinking_time, self.column_remover_active,
+                                 self.gravity_off_active, notification),
+                      [(0, 0, WIDTH, SQUARE_SIZE), (0, 40, 220, 45)])
+        stats_rect = None
+        if SEARCH_STATS and self.search_stats is not None:
+            overlay = self.search_stats_surface()
+            stats_rect = (WIDTH - overlay.get_width() - 5, SQUARE_SIZE + 5, overlay.get_width(), overlay.get_height())
+        regions.track('search_stats', stats_rect and id(self.search_stats), [stats_rect] if stats_rect else [])
+        
+        # Power-up panel, and its FPS readout once a second
+        regions.track('powerups', (self.player_powerups['column_remover'].active, self.player_powerups['gravity_off'].active,
+                                   self.column_remover_active, self.gravity_off_active, self.ai_difficulty),
+                      [(0, HEIGHT - 100, WIDTH, 100)])
+        if time.time() - self.fps_time >= 1.0:
+            self.fps_shown = int(clock.get_fps())
+            self.fps_time = time.time()
+        regions.track('fps', self.fps_shown, [(WIDTH - 150, HEIGHT - 65, 150, 30)])
 
 def show_game_over_screen(winner):
     """
@@ -1007,30 +1120,32 @@ def show_game_over_screen(winner):
     play_again_button = Button(WIDTH//2 - button_width//2, start_y, button_width, button_height, "Play Again", GREEN, (0, 180, 0), WHITE)
     exit_button = Button(WIDTH//2 - button_width//2, start_y + button_height + spacing, button_width, button_height, "Exit to Menu", RED, (180, 40, 40), WHITE)
     
+    # Winner announcement
+    if winner == 1:
+        title_text = TITLE_FONT.render("YOU WIN!", True, RED)
+        subtitle_text = LARGE_FONT.render("Congratulations! You defeated the AI.", True, WHITE)
+    elif winner == 2:
+        title_text = TITLE_FONT.render("AI WINS!", True, YELLOW)
+        subtitle_text = LARGE_FONT.render("Better luck next time!", True, WHITE)
+    else:
+        title_text = TITLE_FONT.render("DRAW!", True, WHITE)
+        subtitle_text = LARGE_FONT.render("It's a tie! No one wins.", True, LIGHT_BLUE)
+    
+    drawn_state = None  # Button hover state on screen; the screen is only redrawn when it changes
     while game_over:
-        screen.fill(DARK_BLUE)
-        
-        # Draw winner announcement
-        if winner == 1:
-            title_text = TITLE_FONT.render("YOU WIN!", True, RED)
-            subtitle_text = LARGE_FONT.render("Congratulations! You defeated the AI.", True, WHITE)
-        elif winner == 2:
-            title_text = TITLE_FONT.render("AI WINS!", True, YELLOW)
-            subtitle_text = LARGE_FONT.render("Better luck next time!", True, WHITE)
-        else:
-            title_text = TITLE_FONT.render("DRAW!", True, WHITE)
-            subtitle_text = LARGE_FONT.render("It's a tie! No one wins.", True, LIGHT_BLUE)
-        
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//4))
-        screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, HEIGHT//4 + 80))
-        
         mouse_pos = pygame.mouse.get_pos()
-        
         play_again_button.check_hover(mouse_pos)
-        play_again_button.draw(screen)
-        
         exit_button.check_hover(mouse_pos)
-        exit_button.draw(screen)
+        
+        state = (play_again_button.is_hovered, exit_button.is_hovered)
+        if state != drawn_state or not DIRTY_UPDATES:
+            screen.fill(DARK_BLUE)
+            screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//4))
+            screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, HEIGHT//4 + 80))
+            play_again_button.draw(screen)
+            exit_button.draw(screen)
+            pygame.display.update()
+            drawn_state = state
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -1044,14 +1159,24 @@ def show_game_over_screen(winner):
                 elif exit_button.is_clicked(mouse_pos, event):
                     return False  # Exit to menu
         
-        pygame.display.update()
         clock.tick(60)
 
+def book_note(rows_text, cols_text):
+    """Whether the grid typed into the custom grid menu has an opening book; Hard searches from move one if not"""
+    try:
+        rows = max(10, min(19, int(rows_text)))
+        cols = max(16, min(23, int(cols_text)))
+    except ValueError:
+        return ""
+    if os.path.exists(book_path(rows, cols, CONNECT_N)):
+        return f"Opening book available for {rows}x{cols}"
+    return f"No opening book for {rows}x{cols}: Hard searches its opening moves"
+
 def custom_grid_menu():
     """
     Menu for selecting custom grid dimensions and connect-n value
     """
-    global ROWS, COLS, CONNECT_N, WIDTH, HEIGHT, screen
+    global ROWS, COLS, CONNECT_N, WIDTH, HEIGHT, GEOMETRY, screen
     
     screen.fill(DARK_BLUE)
     
@@ -1072,17 +1197,11 @@ def custom_grid_menu():
     
     # Adjust title position
     title_y = 50
+    title_text = TITLE_FONT.render("CUSTOM GRID SETTINGS", True, WHITE)
+    subtitle_text = MEDIUM_FONT.render("Customize your game board dimensions", True, LIGHT_BLUE)
     
+    drawn_state = None  # Inputs and hover state on screen; the screen is only redrawn when they change
     while menu:
-        screen.fill(DARK_BLUE)
-        
-        # Draw titles
-        title_text = TITLE_FONT.render("CUSTOM GRID SETTINGS", True, WHITE)
-        subtitle_text = MEDIUM_FONT.render("Customize your game board dimensions", True, LIGHT_BLUE)
-        
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, title_y))
-        screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, title_y + 70))
-        
         # Process events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -1107,6 +1226,8 @@ def custom_grid_menu():
                         new_cols = max(16, min(23, new_cols))  # Min 16, max 23 columns
                         
                         # Apply new settings
+                        if (new_rows, new_cols) != (ROWS, COLS):
+                            GEOMETRY = get_geometry(new_rows, new_cols, CONNECT_N)
                         ROWS = new_rows
                         COLS = new_cols
                         
@@ -1125,6 +1246,7 @@ def custom_grid_menu():
                         screen.blit(error_text, (WIDTH//2 - error_text.get_width()//2, HEIGHT//2 + 260))
                         pygame.display.update()
                         pygame.time.wait(1000)
+                        drawn_state = None
                 
                 elif cancel_button.is_clicked(mouse_pos, event):
                     return
@@ -1133,19 +1255,32 @@ def custom_grid_menu():
         rows_input.update()
         cols_input.update()
         
-        # Draw input boxes
-        rows_input.draw(screen)
-        cols_input.draw(screen)
-        
         mouse_pos = pygame.mouse.get_pos()
-        
         save_button.check_hover(mouse_pos)
-        save_button.draw(screen)
-        
         cancel_button.check_hover(mouse_pos)
-        cancel_button.draw(screen)
         
-        pygame.display.update()
+        state = (rows_input.text, rows_input.active, cols_input.text, cols_input.active,
+                 save_button.is_hovered, cancel_button.is_hovered)
+        if state != drawn_state or not DIRTY_UPDATES:
+            screen.fill(DARK_BLUE)
+            
+            # Draw titles
+            screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, title_y))
+            screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, title_y + 70))
+            
+            # Draw input boxes
+            rows_input.draw(screen)
+            cols_input.draw(screen)
+            
+            # Grids without a book still play, but the AI's first moves are searched
+            book_text = FONT.render(book_note(rows_input.text, cols_input.text), True, LIGHT_GRAY)
+            screen.blit(book_text, (WIDTH//2 - book_text.get_width()//2, HEIGHT//2 + 60))
+            
+            save_button.draw(screen)
+            cancel_button.draw(screen)
+            
+            pygame.display.update()
+            drawn_state = state
         clock.tick(60)
 
 def main_menu():
@@ -1153,55 +1288,69 @@ def main_menu():
     
     menu = True
     
-    # Adjust button positions and sizes to fit screen better
+    # Six buttons must fit under the titles in the smallest window (10 rows, 650 px high):
+    # with these sizes they end at y=579 there
     button_width = 250  # Reduced from 300
-    button_height = 50  # Reduced from 60
-    spacing = 20  # Space between buttons
-    start_y = HEIGHT//2 - 60  # Start buttons higher up the screen
+    button_height = 44
+    spacing = 12  # Space between buttons
     
     difficulty_buttons = [
-        Button(WIDTH//2 - button_width//2, start_y, button_width, button_height, "Easy", RED, (180, 40, 40), WHITE),
-        Button(WIDTH//2 - button_width//2, start_y + button_height + spacing, button_width, button_height, "Medium", (60, 60, 60), (80, 80, 80), WHITE),
-        Button(WIDTH//2 - button_width//2, start_y + 2*(button_height + spacing), button_width, button_height, "Hard", (60, 60, 60), (80, 80, 80), WHITE)
+        Button(0, 0, button_width, button_height, "Easy", RED, (180, 40, 40), WHITE),
+        Button(0, 0, button_width, button_height, "Medium", (60, 60, 60), (80, 80, 80), WHITE),
+        Button(0, 0, button_width, button_height, "Hard", (60, 60, 60), (80, 80, 80), WHITE),
+        Button(0, 0, button_width, button_height, "Expert", (60, 60, 60), (80, 80, 80), WHITE)
     ]
+    difficulties = ["easy", "medium", "hard", "expert"]  # Difficulty of each button
     
-    custom_grid_button = Button(WIDTH//2 - button_width//2, start_y + 3*(button_height + spacing), button_width, button_height, "Custom Grid", (60, 60, 60), (80, 80, 80), WHITE)
-    start_button = Button(WIDTH//2 - button_width//2, start_y + 4*(button_height + spacing), button_width, button_height, "Start Game", GREEN, (0, 180, 0), WHITE)
+    custom_grid_button = Button(0, 0, button_width, button_height, "Custom Grid", (60, 60, 60), (80, 80, 80), WHITE)
+    start_button = Button(0, 0, button_width, button_height, "Start Game", GREEN, (0, 180, 0), WHITE)
     
     selected_difficulty = "easy"
     
     # Adjust title position
     title_y = 50  # Move title up
+    buttons = difficulty_buttons + [custom_grid_button, start_button]
+    
+    def layout_buttons():
+        """Stack the buttons in the middle of the current window, returning the first one's y"""
+        start_y = HEIGHT//2 - 70
+        for i, btn in enumerate(buttons):
+            btn.rect.x = WIDTH//2 - button_width//2
+            btn.rect.y = start_y + i * (button_height + spacing)
+        return start_y
     
+    start_y = layout_buttons()
+    
+    drawn_state = None  # Buttons and grid size on screen; the screen is only redrawn when they change
     while menu:
-        screen.fill(DARK_BLUE)
-        
-        # Draw titles with adjusted font size and position
-        title_text = TITLE_FONT.render("CONNECT 8", True, WHITE)
-        subtitle_text = MEDIUM_FONT.render("A Strategic Board Game with Adaptive AI", True, LIGHT_BLUE)
-        
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, title_y))
-        screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, title_y + 60))
-        
-        # Draw section headers
-        difficulty_text = LARGE_FONT.render("Select Difficulty:", True, WHITE)
-        screen.blit(difficulty_text, (WIDTH//2 - difficulty_text.get_width()//2, start_y - 50))
-        
-        # Display grid size info
-        grid_info = MEDIUM_FONT.render(f"Grid Size: {ROWS}x{COLS}", True, LIGHT_BLUE)
-        screen.blit(grid_info, (WIDTH//2 - grid_info.get_width()//2, start_y - 110))
-        
         mouse_pos = pygame.mouse.get_pos()
-        
-        for btn in difficulty_buttons:
+        for btn in buttons:
             btn.check_hover(mouse_pos)
-            btn.draw(screen)
-            
-        custom_grid_button.check_hover(mouse_pos)
-        custom_grid_button.draw(screen)
         
-        start_button.check_hover(mouse_pos)
-        start_button.draw(screen)
+        state = (ROWS, COLS, tuple((btn.is_hovered, btn.color, btn.rect.topleft) for btn in buttons))
+        if state != drawn_state or not DIRTY_UPDATES:
+            screen.fill(DARK_BLUE)
+            
+            # Draw titles with adjusted font size and position
+            title_text = TITLE_FONT.render("CONNECT 8", True, WHITE)
+            subtitle_text = MEDIUM_FONT.render("A Strategic Board Game with Adaptive AI", True, LIGHT_BLUE)
+            
+            screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, title_y))
+            screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, title_y + 60))
+            
+            # Draw section headers
+            difficulty_text = LARGE_FONT.render("Select Difficulty:", True, WHITE)
+            screen.blit(difficulty_text, (WIDTH//2 - difficulty_text.get_width()//2, start_y - 50))
+            
+            # Display grid size info
+            grid_info = MEDIUM_FONT.render(f"Grid Size: {ROWS}x{COLS}", True, LIGHT_BLUE)
+            screen.blit(grid_info, (WIDTH//2 - grid_info.get_width()//2, start_y - 110))
+            
+            for btn in buttons:
+                btn.draw(screen)
+            
+            pygame.display.update()
+            drawn_state = state
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -1209,48 +1358,25 @@ def main_menu():
                 sys.exit()
                 
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if difficulty_buttons[0].is_clicked(mouse_pos, event):
-                    selected_difficulty = "easy"
-                    # Update button colors to show selection
-                    difficulty_buttons[0].color = RED
-                    difficulty_buttons[1].color = (60, 60, 60)
-                    difficulty_buttons[2].color = (60, 60, 60)
-                    
-                elif difficulty_buttons[1].is_clicked(mouse_pos, event):
-                    selected_difficulty = "medium"
+                clicked = [i for i, btn in enumerate(difficulty_buttons) if btn.is_clicked(mouse_pos, event)]
+                if clicked:
+                    selected_difficulty = difficulties[clicked[0]]
                     # Update button colors to show selection
-                    difficulty_buttons[0].color = (60, 60, 60)
-                    difficulty_buttons[1].color = RED
-                    difficulty_buttons[2].color = (60, 60, 60)
-                    
-                elif difficulty_buttons[2].is_clicked(mouse_pos, event):
-                    selected_difficulty = "hard"
-                    # Update button colors to show selection
-                    difficulty_buttons[0].color = (60, 60, 60)
-                    difficulty_buttons[1].color = (60, 60, 60)
-                    difficulty_buttons[2].color = RED
+                    for i, btn in enumerate(difficulty_buttons):
+                        btn.color = RED if i == clicked[0] else (60, 60, 60)
                 
                 elif custom_grid_button.is_clicked(mouse_pos, event):
                     custom_grid_menu()
+                    drawn_state = None  # The grid menu drew over everything
                     # After returning from custom grid menu, resize buttons if needed
-                    start_y = HEIGHT//2 - 60
-                    
-                    for i, btn in enumerate(difficulty_buttons):
-                        btn.rect.y = start_y + i * (button_height + spacing)
-                        btn.rect.x = WIDTH//2 - button_width//2
-                    
-                    custom_grid_button.rect.y = start_y + 3 * (button_height + spacing)
-                    custom_grid_button.rect.x = WIDTH//2 - button_width//2
-                    
-                    start_button.rect.y = start_y + 4 * (button_height + spacing)
-                    start_button.rect.x = WIDTH//2 - button_width//2
+                    start_y = layout_buttons()
                     
                 elif start_button.is_clicked(mouse_pos, event):
                     # Start the game after a short delay
                     pygame.time.wait(300)
                     return selected_difficulty, True  # Always use gravity mode
         
-        pygame.display.update()
+        clock.tick(60)
 
 def play_game():
     global ROWS, COLS, CONNECT_N, WIDTH, HEIGHT, screen
@@ -1265,6 +1391,9 @@ def play_game():
     game_running = True
     global clock
     clock = pygame.time.Clock()
+    frame_stats = FrameStats()
+    regions = DirtyRegions()
+    scheduler = Scheduler()
     
     while game_running:
         mouse_pos = pygame.mouse.get_pos()
@@ -1275,26 +1404,32 @@ def play_game():
         game.hovered_column = col
         game.hovered_row = row
         
-        screen.fill(DARK_BLUE)
-        
-        # Update animations
-        game.update_animations()
-        
-        # Draw the game board
-        game.draw_board(screen)
+        # Advance animations by the time since the last frame and run due timers
+        scheduler.tick()
+        game.update_animations(scheduler.dt)
         
-        # Draw hover piece if it's player's turn and input isn't locked
-        if game.turn == 0 and not game.game_over and not game.lock_player_input:
-            if game.gravity_off_active:
-                game.draw_hover_piece(screen, col, row)
-            else:
-                game.draw_hover_piece(screen, col)
-        
-        # Draw powerups and game info
-        game.draw_powerups(screen)
-        
-        # Draw game status
-        game.draw_game_status(screen)
+        # Redraw only what changed since the last frame, or nothing at all
+        if not DIRTY_UPDATES:
+            regions.mark_all()
+        game.mark_dirty(regions, col, row)
+        if regions.begin(screen):
+            screen.fill(DARK_BLUE)
+            
+            # Draw the game board
+            game.draw_board(screen)
+            
+            # Draw hover piece if it's player's turn and input isn't locked
+            if game.turn == 0 and not game.game_over and not game.lock_player_input:
+                if game.gravity_off_active:
+                    game.draw_hover_piece(screen, col, row)
+                else:
+                    game.draw_hover_piece(screen, col)
+            
+            # Draw powerups and game info
+            game.draw_powerups(screen)
+            
+            # Draw game status
+            game.draw_game_status(screen)
         
         # Handle events
         for event in pygame.event.get():
@@ -1385,6 +1520,7 @@ def play_game():
             
             # Allow players to quit game with Escape key
             if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                game.close()
                 return  # Return to main menu
         
         # Check if animations are done and we need to switch to AI turn
@@ -1392,46 +1528,35 @@ def play_game():
             game.turn = 1  # Switch to AI's turn
             game.switch_to_ai_after_animation = False
         
+        # Search ahead while the player thinks
+        if (game.turn == 0 and not game.game_over and not game.animated_pieces
+                and not game.lock_player_input and not game.pondering):
+            game.start_pondering()
+        
         # AI's turn
-        if game.turn == 1 and not game.game_over and len(game.animated_pieces) == 0:
+        game.poll_ai_move()
+        if (game.turn == 1 and not game.game_over and len(game.animated_pieces) == 0
+                and not scheduler.pending('ai_move')):
             if not game.ai_thinking and game.ai_move is None:
-                # Start AI thinking in a separate thread
-                game.ai_thinking = True
-                ai_thread = threading.Thread(target=game.ai_think_thread)
-                ai_thread.daemon = True
-                ai_thread.start()
+                # Start AI thinking in a separate thread or the engine process
+                game.start_ai_move()
             
             elif not game.ai_thinking and game.ai_move is not None:
                 # AI has made a decision
-                ai_col, ai_row = game.ai_move
+                ai_col, ai_row, ai_powerup = game.ai_move
                 game.ai_move = None
+                if PROFILE_FRAMES:
+                    print(f"Frames while AI was thinking ({ENGINE_MODE}): {frame_stats.summary()}")
+                    frame_stats.reset()
                 
-                if ai_col is not None:  # If AI didn't use a powerup
-                    # Add a short delay before AI moves for better UX
-                    pygame.time.wait(300)
-                    
-                    # For gravity off mode with AI
-                    if ai_row is not None and game.ai_powerups['gravity_off'].active:
-                        success, _ = game.drop_piece(ai_col, game.ai_piece, ai_row, True)
-                        # Consume the gravity off powerup after use
-                        game.ai_powerups['gravity_off'].deactivate()
-                    else:
-                        success, _ = game.drop_piece(ai_col, game.ai_piece)
-                    
-                    if success:
-                        if game.check_win(game.ai_piece):
-                            game.game_over = True
-                            game.winner = 2
-                        
-                        # Check for powerup after a move
-                        got_powerup, powerup_type = game.check_for_powerup()
-                
-                # Set a flag to switch turn after AI animation completes
-                if not game.animated_pieces:  # If animation completed immediately
-                    game.turn = 0  # Switch to player's turn
-                    game.lock_player_input = False  # Unlock player input
+                if ai_powerup == 'column_remover':
+                    game.use_powerup('column_remover', ai_col)
+                    game.end_ai_turn()
+                elif ai_col is not None:  # If AI didn't use a powerup
+                    # Add a short delay before AI moves for better UX, without blocking the loop
+                    scheduler.after(AI_MOVE_DELAY, 'ai_move', functools.partial(game.play_ai_move, ai_col, ai_row))
                 else:
-                    game.switch_to_player_after_animation = True
+                    game.end_ai_turn()
         
         # Check if AI animations are done and we need to switch back to player
         if (game.switch_to_player_after_animation and not game.animated_pieces):
@@ -1446,17 +1571,26 @@ def play_game():
         
         # If game is over, show game over screen after a short delay
         if game.game_over and not game.animated_pieces:
-            pygame.time.wait(1000)  # Give player time to see the final board
-            play_again = show_game_over_screen(game.winner)
-            if play_again:
-                game.reset_game()  # Reset the game with same settings
-            else:
-                return  # Return to main menu
+            if not scheduler.pending('game_over'):
+                game.stop_pondering()  # A ponder from the player's last turn is of no use now
+                scheduler.after(GAME_OVER_DELAY, 'game_over')  # Give player time to see the final board
+            elif scheduler.expired('game_over'):
+                play_again = show_game_over_screen(game.winner)
+                if play_again:
+                    game.reset_game()  # Reset the game with same settings
+                    scheduler.clear()
+                    regions.mark_all()
+                else:
+                    game.close()
+                    return  # Return to main menu
         
-        pygame.display.update()
-        clock.tick(60)
+        regions.flush(screen)
+        frame_time = clock.tick(60)
+        if PROFILE_FRAMES and game.ai_thinking:
+            frame_stats.record(frame_time)
 
 if __name__ == "__main__":
+    init_display()
     clock = pygame.time.Clock()  # Initialize the global clock
     while True:
         play_game()
\ No newline at end of file
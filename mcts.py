@@ -0,0 +1,286 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from rollouts import BatchPlayouts
+from threats import ThreatMap
+
+
+class MCTSResult:
+    """Move chosen by a Monte Carlo tree search and how much work went into it"""
+
+    def __init__(self, move, visits, win_rate, playouts, reused, nodes, depth, elapsed):
+        self.move = move  # (col, row, powerup) like Engine.choose_move
+        self.visits = visits  # Playouts through the chosen move
+        self.win_rate = win_rate  # The AI's average result through the chosen move, 0..1
+        self.playouts = playouts  # Playouts run by this search
+        self.reused = reused  # Playouts kept in the tree from earlier moves
+        self.nodes = nodes
+        self.depth = depth  # Deepest tree node reached, in plies below the root
+        self.elapsed = elapsed
+
+    @property
+    def playouts_per_second(self):
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"MCTSResult(move={self.move}, visits={self.visits}, win_rate={self.win_rate:.2f}, "
+                f"playouts={self.playouts} ({self.playouts_per_second:.0f}/s), reused={self.reused}, "
+                f"nodes={self.nodes}, depth={self.depth}, elapsed={self.elapsed:.2f}s)")
+
+
+class Node:
+    """One position in the search tree, reached by `move` of `mover`"""
+
+    __slots__ = ('move', 'mover', 'parent', 'children', 'untried', 'visits', 'value', 'key', 'powerups',
+                 'terminal', 'depth')
+
+    def __init__(self, move, mover, parent, key, powerups, depth):
+        self.move = move
+        self.mover = mover
+        self.parent = parent
+        self.children = []
+        self.untried = None  # Moves not expanded yet, generated on the first visit; best last
+        self.visits = 0
+        self.value = 0.0  # Sum of results for mover, so parents pick children by their own mover's wins
+        self.key = key
+        self.powerups = powerups  # (gravity_off, column_remover) the AI still holds here
+        self.terminal = None  # The AI's result if the game is over here
+        self.depth = depth
+
+
+class MonteCarloSearch:
+    """UCT search for the AI's move, with the tree kept between moves
+
+    Moves are (col, row, powerup) tuples like Engine.choose_move returns:
+    drops, and while the AI holds them, gravity off placements on the
+    gravity_off_cells most promising empty cells (ranked by ThreatMap) and
+    removals of columns holding player pieces. The player is assumed to
+    drop. Playouts drop random pieces for up to playout_plies plies and then
+    score the position with the board's running evaluation, squashed to a
+    0..1 win estimate. With playout_batch set, that many leaves are selected
+    at a time under virtual loss and played out together by BatchPlayouts.
+    """
+
+    def __init__(self, evaluator, player_piece=1, ai_piece=2, think_time=3.0):
+        self.evaluator = evaluator
+        self.player_piece = player_piece
+        self.ai_piece = ai_piece
+        self.think_time = think_time  # Seconds a search may take
+        self.max_playouts = None  # Playouts a search may run, or None for only the time budget
+        self.exploration = 1.4  # UCT exploration constant; higher tries weaker moves more often
+        self.playout_plies = 24  # Random plies before a playout is scored, or None to play to the end
+        self.value_scale = 5000.0  # Evaluation that counts as about a 73% win estimate
+        self.gravity_off_cells = 8  # Gravity off placements considered per position
+        # Leaves played out together by BatchPlayouts, to the end of the game, or None
+        # for one Python playout (limited to playout_plies) per leaf
+        self.playout_batch = None
+        self.batch_playouts = None
+        self.root = None
+        self.last_result = None
+
+    def reset(self):
+        """Forget the tree, e.g. for a new game"""
+        self.root = None
+        self.last_result = None
+
+    def node_key(self, board, to_move, powerups):
+        return board.hash, to_move, powerups
+
+    def find_root(self, board, powerups):
+        """The node of the last tree for this position with the AI to move, or a new one
+
+        The position is usually two plies below the old root (the AI's move
+        and the player's reply), so only that far is looked at.
+        """
+        key = self.node_key(board, self.ai_piece, powerups)
+        if self.root is not None:
+            if self.root.key == key:
+                return self.root
+            for node in self.root.children:
+                for child in node.children:
+                    if child.key == key:
+                        child.parent = None
+                        return child
+        return Node(None, self.player_piece, None, key, powerups, 0)
+
+    def search(self, board, gravity_off=False, column_remover=False):
+        """Run playouts from board with the AI to move, returning an MCTSResult
+
+        Stops when think_time has passed or max_playouts playouts have run,
+        whichever comes first. board is not changed.
+        """
+        start_time = time.time()
+        deadline = start_time + self.think_time
+        root = self.find_root(board, (gravity_off, column_remover))
+        self.root = root
+        reused = root.visits
+        playouts = 0
+        nodes = 0
+        depth = 0
+
+        while self.max_playouts is None or playouts < self.max_playouts:
+            if playouts and time.time() > deadline:
+                break
+            count = self.playout_batch or 1
+            if self.max_playouts is not None:
+                count = min(count, self.max_playouts - playouts)
+
+            # Each leaf's visit is counted as it's chosen, before its result is
+            # known: a virtual loss that spreads a batch over different leaves
+            leaves = []
+            for _ in range(count):
+                node, sim, expanded = self.descend(root, board)
+                nodes += expanded
+                depth = max(depth, node.depth - root.depth)
+                self.add_visit(node)
+                leaves.append((node, sim))
+            if self.playout_batch:
+                values = self.batch_values(leaves)
+            else:
+                values = [node.terminal if node.terminal is not None else self.playout(sim, 3 - node.mover)
+                          for node, sim in leaves]
+            for (node, _), value in zip(leaves, values):
+                self.add_result(node, value)
+            playouts += count
+
+        elapsed = time.time() - start_time
+        if not root.children:
+            self.last_result = MCTSResult((None, None, None), 0, 0.0, playouts, reused, nodes, depth, elapsed)
+            return self.last_result
+        best = max(root.children, key=lambda child: child.visits)
+        self.last_result = MCTSResult(best.move, best.visits, best.value / best.visits, playouts, reused, nodes,
+                                      depth, elapsed)
+        return self.last_result
+
+    def descend(self, root, board):
+        """Select a leaf below root and expand it, as (node, board at node, whether node is new)"""
+        node = root
+        sim = board.copy()
+
+        # Selection: follow the best child while every move has been tried
+        while node.terminal is None:
+            if node.untried is None:
+                node.untried = self.moves(sim, 3 - node.mover, node.powerups)
+            if node.untried or not node.children:
+                break
+            node = self.select_child(node)
+            self.apply(sim, node.move, node.mover)
+
+        # Expansion: add one untried move
+        if node.terminal is None and node.untried:
+            move = node.untried.pop()
+            mover = 3 - node.mover
+            self.apply(sim, move, mover)
+            powerups = self.powerups_after(node.powerups, move, mover)
+            child = Node(move, mover, node, self.node_key(sim, 3 - mover, powerups), powerups, node.depth + 1)
+            if sim.winner is not None:
+                child.terminal = 1.0 if sim.winner == self.ai_piece else 0.0
+            elif not sim.valid_columns():
+                child.terminal = 0.5
+            node.children.append(child)
+            return child, sim, True
+        if node.terminal is None:
+            node.terminal = 0.5  # Nothing left to play
+        return node, sim, False
+
+    def add_visit(self, node):
+        while node is not None:
+            node.visits += 1
+            node = node.parent
+
+    def add_result(self, node, value):
+        """Backpropagation: every node keeps its mover's results"""
+        while node is not None:
+            node.value += value if node.mover == self.ai_piece else 1.0 - value
+            node = node.parent
+
+    def get_batch_playouts(self):
+        if self.batch_playouts is None:
+            evaluator = self.evaluator
+            self.batch_playouts = BatchPlayouts(evaluator.rows, evaluator.cols, evaluator.connect_n)
+        return self.batch_playouts
+
+    def batch_values(self, leaves):
+        """The AI's result of one random game from each open leaf, all played at once in NumPy"""
+        values = [node.terminal for node, _ in leaves]
+        open_leaves = [i for i, value in enumerate(values) if value is None]
+        if open_leaves:
+            games = np.stack([leaves[i][1].to_array(np.int8) for i in open_leaves])
+            to_move = np.array([3 - leaves[i][0].mover for i in open_leaves], dtype=np.int8)
+            winners = self.get_batch_playouts().run_many(games, to_move)[0]
+            for i, winner in zip(open_leaves, winners.tolist()):
+                values[i] = 1.0 if winner == self.ai_piece else 0.0 if winner else 0.5
+        return values
+
+    def select_child(self, node):
+        """UCT: the child with the best average result plus exploration bonus"""
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        return max(node.children,
+                   key=lambda child: child.value / child.visits + exploration * math.sqrt(log_visits / child.visits))
+
+    def moves(self, board, to_move, powerups):
+        """Every move to search from a position, the one to expand first last"""
+        cols = board.cols
+        center = (cols - 1) / 2
+        drops = sorted(board.valid_columns(), key=lambda col: abs(col - center))
+        moves = [(col, None, None) for col in drops]
+        if to_move != self.ai_piece:
+            return moves[::-1]
+        gravity_off, column_remover = powerups
+
+        if gravity_off:
+            # Placements on the best-scoring cells; one on a column's lowest empty cell is just a drop
+            threats = ThreatMap(self.evaluator, board, self.ai_piece)
+            empty = np.flatnonzero(threats.empty)
+            lowest = {board.next_open_row(col) * cols + col for col in drops}
+            empty = empty[~np.isin(empty, list(lowest))]
+            best = empty[np.argsort(-threats.scores[empty], kind='stable')[:self.gravity_off_cells]]
+            moves.extend((int(cell) % cols, int(cell) // cols, None) for cell in best)
+
+        if column_remover:
+            player_bits = board.bits[self.player_piece]
+            moves.extend((col, None, 'column_remover') for col in range(cols)
+                         if (player_bits >> (col * board.height)) & board.column_mask)
+        return moves[::-1]
+
+    def powerups_after(self, powerups, move, mover):
+        if mover != self.ai_piece:
+            return powerups
+        gravity_off, column_remover = powerups
+        col, row, powerup = move
+        if powerup == 'column_remover':
+            column_remover = False
+        elif row is not None:
+            gravity_off = False
+        return gravity_off, column_remover
+
+    def apply(self, board, move, mover):
+        col, row, powerup = move
+        if powerup == 'column_remover':
+            board.clear_column(col)
+        elif row is not None:
+            board.place(row, col, mover)
+        else:
+            board.drop(col, mover)
+
+    def playout(self, board, piece):
+        """The AI's result of random drops from board with piece to move: 1 win, 0 loss, else an estimate"""
+        plies = 0
+        while self.playout_plies is None or plies < self.playout_plies:
+            columns = board.valid_columns()
+            if not columns:
+                return 0.5
+            board.drop(random.choice(columns), piece)
+            if board.winner is not None:
+                return 1.0 if board.winner == self.ai_piece else 0.0
+            piece = 3 - piece
+            plies += 1
+        if board.evaluation is not None and board.evaluation.piece == self.ai_piece:
+            score = board.evaluation.score
+        else:
+            score = self.evaluator.score(board.to_array(np.intp), self.ai_piece)
+        return 1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, score / self.value_scale))))
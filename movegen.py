@@ -0,0 +1,149 @@
+import numpy as np
+
+from threats import ThreatMap
+from transposition import powerup_keys
+
+POWERUPS = ('gravity_off', 'column_remover')
+
+
+class PowerUps:
+    """Power-ups each side holds at a search node; moves spend them and undo gives them back
+
+    key XORs together a Zobrist-style key for every power-up held, so the
+    transposition table tells apart positions that differ only in them.
+    """
+
+    def __init__(self, held=()):
+        self.keys = powerup_keys()
+        self.held = set()  # (piece, power-up) pairs
+        self.key = 0
+        for piece, powerup in held:
+            self.restore(piece, powerup)
+
+    def holds(self, piece, powerup):
+        return (piece, powerup) in self.held
+
+    def holds_any(self, piece):
+        return (piece, 'gravity_off') in self.held or (piece, 'column_remover') in self.held
+
+    def spend(self, piece, powerup):
+        self.held.remove((piece, powerup))
+        self.key ^= self.keys[piece, powerup]
+
+    def restore(self, piece, powerup):
+        self.held.add((piece, powerup))
+        self.key ^= self.keys[piece, powerup]
+
+    def __repr__(self):
+        return f"PowerUps({sorted(self.held)})"
+
+
+def powerup_used(move):
+    """The power-up a (col, row, powerup) move spends, or None for a drop"""
+    col, row, powerup = move
+    if powerup is not None:
+        return powerup
+    return 'gravity_off' if row is not None else None
+
+
+class MoveGenerator:
+    """Drops, gravity off placements and column removals as one stream of searchable moves
+
+    Moves are (col, row, powerup) tuples like Engine.choose_move returns, and
+    come lazily, cheapest first: the drop columns in the order the caller
+    gives, then placements if the mover holds gravity off, then removals if
+    it holds the column remover. A node that cuts off on a drop never builds
+    the ThreatMap that ranks placements. Gravity off could go on any empty
+    cell, far more than there are columns, so only the mover's winning
+    cells, the cells blocking the opponent's wins and the gravity_off_cells
+    best-scoring others are generated; a column's lowest empty cell is left
+    out since placing there is just a drop. Removals are limited to the
+    removal_columns columns holding the most opponent pieces.
+    """
+
+    def __init__(self, evaluator, gravity_off_cells=6, removal_columns=4):
+        self.evaluator = evaluator
+        self.gravity_off_cells = gravity_off_cells  # Placements generated besides wins and blocks
+        self.removal_columns = removal_columns  # Column removals generated
+
+    def moves(self, board, piece, drops, powerups, first=None):
+        """Yield the moves of piece at board, starting with `first` (e.g. the TT move) if it's legal
+
+        board may be changed between moves, as long as it is back to the same
+        position whenever the next one is asked for.
+        """
+        if first is not None and self.is_legal(board, first, piece, powerups):
+            yield first
+        for col in drops:
+            move = (col, None, None)
+            if move != first:
+                yield move
+        cols = board.cols
+        if powerups.holds(piece, 'gravity_off'):
+            for cell in self.placement_cells(board, piece):
+                move = (cell % cols, cell // cols, None)
+                if move != first:
+                    yield move
+        if powerups.holds(piece, 'column_remover'):
+            for col in self.removal_columns_for(board, piece):
+                move = (col, None, 'column_remover')
+                if move != first:
+                    yield move
+
+    def is_legal(self, board, move, piece, powerups):
+        col, row, powerup = move
+        if powerup is not None:
+            return powerups.holds(piece, powerup) and 0 <= col < board.cols
+        if row is None:
+            return board.is_valid_column(col)
+        return powerups.holds(piece, 'gravity_off') and board.get(row, col) == 0
+
+    def placement_cells(self, board, piece):
+        """Flat cells worth a gravity off placement: wins, then blocks, then the best scores"""
+        threats = ThreatMap(self.evaluator, board, piece)
+        cols = board.cols
+        candidates = threats.empty.copy()
+        for col in board.valid_columns():
+            candidates[board.next_open_row(col) * cols + col] = False
+
+        cells = []
+        for cell in np.concatenate([threats.wins[piece], threats.wins[threats.opp_piece]]).tolist():
+            if candidates[cell]:
+                candidates[cell] = False
+                cells.append(cell)
+        rest = np.flatnonzero(candidates)
+        best = rest[np.argsort(-threats.scores[rest], kind='stable')[:self.gravity_off_cells]]
+        return cells + best.tolist()
+
+    def removal_columns_for(self, board, piece):
+        """Columns holding opponent pieces, most opponent pieces (net of piece's own) first"""
+        opponent = 3 - piece
+        center = (board.cols - 1) / 2
+        ranked = []
+        for col in range(board.cols):
+            shift = col * board.height
+            theirs = bin((board.bits[opponent] >> shift) & board.column_mask).count('1')
+            if theirs:
+                ours = bin((board.bits[piece] >> shift) & board.column_mask).count('1')
+                ranked.append((ours - theirs, abs(col - center), col))
+        ranked.sort()
+        return [col for _, _, col in ranked[:self.removal_columns]]
+
+    def make(self, board, move, piece, powerups):
+        """Play move for piece on board, spending its power-up; unmake takes it back"""
+        col, row, powerup = move
+        if powerup == 'column_remover':
+            board.clear_column(col)
+        elif row is not None:
+            board.place(row, col, piece)
+        else:
+            board.drop(col, piece)
+        used = powerup_used(move)
+        if used is not None:
+            powerups.spend(piece, used)
+
+    def unmake(self, board, move, piece, powerups):
+        board.undo()
+        used = powerup_used(move)
+        if used is not None:
+            powerups.restore(piece, used)
@@ -0,0 +1,114 @@
+import os
+import struct
+
+import numpy as np
+
+BOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'books')
+
+# File layout: header, then `count` sorted little-endian uint64 keys, then one
+# column byte per key. The header is padded so the keys are 8-byte aligned.
+MAGIC = b'C8BK'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIIII4x')  # magic, version, rows, cols, connect_n, plies, count
+
+
+def book_path(rows, cols, connect_n, book_dir=None):
+    return os.path.join(book_dir or BOOK_DIR, f"{rows}x{cols}-connect{connect_n}.book")
+
+
+def book_key(board, mover):
+    """Mirror-normalized key of a position with mover to play, as (key, mirrored)
+
+    The key is the Zobrist hash of the board or of its left-right mirror,
+    whichever is smaller, with the side key added when piece 2 is to move.
+    mirrored says the mirror was used, so book columns must be flipped.
+    """
+    keys = board.keys
+    rows, cols, height = board.rows, board.cols, board.height
+    mirror = 0
+    for piece in (1, 2):
+        bits = board.bits[piece]
+        while bits:
+            low = bits & -bits
+            col, offset = divmod(low.bit_length() - 1, height)
+            mirror ^= keys[piece][(rows - 1 - offset) * cols + cols - 1 - col]
+            bits ^= low
+    key = board.hash
+    if mover == 2:
+        key ^= board.side_key
+        mirror ^= board.side_key
+    if mirror < key:
+        return mirror, True
+    return key, False
+
+
+class OpeningBook:
+    """Best first moves for one grid size, memory-mapped from a file written by write_book
+
+    Lookups binary search the sorted keys in place, so opening a book costs
+    nothing until a position is looked up and only the pages touched are read.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"{path} is not an opening book")
+        magic, version, self.rows, self.cols, self.connect_n, self.plies, count = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+        if os.path.getsize(path) != HEADER.size + 9 * count:
+            raise ValueError(f"{path} is truncated")
+        self.path = path
+        self.count = count
+        if count:
+            self.keys = np.memmap(path, dtype='<u8', mode='r', offset=HEADER.size, shape=(count,))
+            self.moves = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.size + 8 * count, shape=(count,))
+        else:
+            self.keys = np.zeros(0, dtype='<u8')
+            self.moves = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, board, mover):
+        """Book column for mover on a BitBoard, or None if the position isn't in the book"""
+        if bin(board.occupied()).count('1') >= self.plies:
+            return None
+        key, mirrored = book_key(board, mover)
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index == self.count or int(self.keys[index]) != key:
+            return None
+        col = int(self.moves[index])
+        if mirrored:
+            col = self.cols - 1 - col
+        return col if board.is_valid_column(col) else None
+
+
+def write_book(path, rows, cols, connect_n, plies, entries):
+    """Write {key: column} entries as a book file, replacing any old one atomically"""
+    keys = np.array(sorted(entries), dtype='<u8')
+    moves = np.array([entries[int(key)] for key in keys], dtype=np.uint8)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, rows, cols, connect_n, plies, len(keys)))
+        f.write(keys.tobytes())
+        f.write(moves.tobytes())
+    os.replace(temporary, path)
+
+
+def load_book(rows, cols, connect_n, book_dir=None):
+    """The opening book for a grid size, or None if none was built or the file is unusable"""
+    path = book_path(rows, cols, connect_n, book_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        book = OpeningBook(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring opening book: {e}")
+        return None
+    if (book.rows, book.cols, book.connect_n) != (rows, cols, connect_n):
+        print(f"Ignoring opening book {path}: built for {book.rows}x{book.cols}")
+        return None
+    return book
@@ -0,0 +1,154 @@
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bitboard import BitBoard
+from evaluation import EvalState
+from search import SearchResult, Searcher
+
+# Per-process state of a pool worker, set up once by _init_worker
+_worker = None
+
+
+class _WorkerState:
+    def __init__(self, rows, cols, connect_n, player_piece, ai_piece, table_size, shared_alpha):
+        self.searcher = Searcher(rows, cols, connect_n, player_piece, ai_piece, table_size)
+        self.shared_alpha = shared_alpha
+        self.search_id = None
+
+
+def _init_worker(rows, cols, connect_n, player_piece, ai_piece, table_size, shared_alpha):
+    global _worker
+    _worker = _WorkerState(rows, cols, connect_n, player_piece, ai_piece, table_size, shared_alpha)
+
+
+def _search_root_move(search_id, player_bits, ai_bits, col, depth, start_time, think_time):
+    """Search one root move in a worker process
+
+    The alpha bound published by moves that already finished is read when the
+    task starts, and raised afterwards if this move did better. Returns
+    (col, value, alpha_used, nodes, pv); value is None if the deadline hit.
+    """
+    state = _worker
+    searcher = state.searcher
+    if search_id != state.search_id:
+        # First task of a new AI move in this worker
+        searcher.start_search()
+        state.search_id = search_id
+    searcher.think_time = think_time
+
+    board = BitBoard.from_bits(searcher.rows, searcher.cols, searcher.connect_n, player_bits, ai_bits)
+    board.evaluation = EvalState(searcher.evaluator, searcher.ai_piece, board.to_array(np.intp))
+    board.drop(col, searcher.ai_piece)
+
+    nodes_before = searcher.nodes_searched
+    alpha = state.shared_alpha.value
+    try:
+        value = searcher.minimax(depth - 1, alpha, math.inf, False, start_time, board)[1]
+    except TimeoutError:
+        return col, None, alpha, searcher.nodes_searched - nodes_before, []
+
+    if value > alpha:
+        with state.shared_alpha.get_lock():
+            if value > state.shared_alpha.value:
+                state.shared_alpha.value = value
+
+    pv = [col]
+    if depth > 1 and board.winner is None:
+        entry = searcher.transposition_table.probe(board.position_key(False))
+        if entry is not None:
+            pv += searcher.extract_pv(board, entry[4], depth - 1, maximizing_player=False)
+    return col, value, alpha, searcher.nodes_searched - nodes_before, pv
+
+
+class ParallelSearch:
+    """Root-parallel iterative deepening over a persistent process pool
+
+    Each iteration searches the previous best move first so the remaining root
+    moves start with a real alpha bound, then spreads the rest over the workers.
+    Workers share that bound through a multiprocessing.Value and keep their own
+    transposition tables between moves.
+    """
+
+    def __init__(self, workers, rows, cols, connect_n, player_piece=1, ai_piece=2, table_size=1 << 18):
+        self.config = (workers, rows, cols, connect_n)
+        self.workers = workers
+        self.cols = cols
+        self.ai_piece = ai_piece
+        self.shared_alpha = multiprocessing.Value('d', -math.inf)
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(rows, cols, connect_n, player_piece, ai_piece, table_size, self.shared_alpha),
+        )
+        self.search_id = 0
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def root_moves(self, sim_board, previous_best):
+        center = (self.cols - 1) / 2
+        moves = sorted(sim_board.valid_columns(), key=lambda col: abs(col - center))
+        if previous_best in moves:
+            moves.remove(previous_best)
+            moves.insert(0, previous_best)
+        return moves
+
+    def search_depth(self, sim_board, depth, moves, start_time, think_time):
+        """Search every root move at one depth; returns (column, value, pv, nodes, completed)"""
+        player_bits, ai_bits = sim_board.bits[1], sim_board.bits[2]
+        self.shared_alpha.value = -math.inf
+
+        def submit(col):
+            return self.pool.submit(_search_root_move, self.search_id, player_bits, ai_bits, col, depth,
+                                    start_time, think_time)
+
+        # Young brothers wait: the first move sets the bound the others search against
+        results = [submit(moves[0]).result()]
+        results += [future.result() for future in [submit(col) for col in moves[1:]]]
+
+        nodes = sum(result[3] for result in results)
+        if results[0][1] is None:
+            return None, None, [], nodes, False
+
+        best = None
+        for order, (col, value, alpha_used, _, pv) in enumerate(results):
+            if value is None:
+                continue
+            # A move that failed low only has an upper bound, so it loses ties to exact values
+            key = (value, value > alpha_used, -order)
+            if best is None or key > best[0]:
+                best = (key, col, value, pv)
+        completed = all(result[1] is not None for result in results)
+        return best[1], best[2], best[3], nodes, completed
+
+    def iterative_deepening(self, max_depth, sim_board, think_time):
+        start_time = time.time()
+        self.search_id += 1
+        result = SearchResult(None, None, 0, 0, 0.0, [], True)
+        nodes = 0
+        if sim_board.winner is not None or not sim_board.valid_columns():
+            return result
+
+        previous_best = None
+        for depth in range(1, max_depth + 1):
+            moves = self.root_moves(sim_board, previous_best)
+            col, score, pv, searched, completed = self.search_depth(sim_board, depth, moves, start_time,
+                                                                    think_time)
+            nodes += searched
+            if col is None:
+                result.completed = False
+                break
+            result = SearchResult(col, score, depth, 0, 0.0, pv, completed)
+            previous_best = col
+
+            # If we're running out of time, stop deepening
+            if not completed or time.time() - start_time > think_time * 0.8:
+                break
+
+        result.nodes = nodes
+        result.elapsed = time.time() - start_time
+        return result
@@ -0,0 +1,139 @@
+import mmap
+import os
+import struct
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialized, torn entries still read as misses
+    fcntl = None
+
+MAGIC = b'C8PC'
+VERSION = 1
+HEADER = struct.Struct('<4sII4x')  # magic, version, slots
+# key, rows, cols, connect_n, ai_piece, depth, column, score, stamp, checksum of everything before it
+SLOT = struct.Struct('<QBBBBBBxxqII')
+WAYS = 4  # Slots per bucket; a position can live in any slot of its bucket
+
+
+class PositionCache:
+    """Hard search results kept in a fixed-size memory-mapped file across games
+
+    Entries are keyed by Zobrist hash (with the side to move), grid size,
+    connect_n and the AI's piece, and remember the column, score and depth of
+    a finished search. A key maps to a bucket of WAYS slots; a new result
+    replaces the same position, an empty or unreadable slot, or else the
+    shallowest and then oldest entry.
+
+    Several game processes can share one file. Readers take no lock: every
+    slot carries a CRC32, so an entry caught half written, or damaged on
+    disk, reads as a miss. Writers hold an exclusive flock while they store.
+    """
+
+    def __init__(self, path, slots=1 << 16):
+        """Open the cache file at path, creating it with `slots` entries if needed
+
+        An existing valid file keeps its own size, since other processes may
+        have it mapped; one with a bad header is started over.
+        """
+        self.path = path
+        self.file = open(path, 'a+b')
+        try:
+            with self.locked():
+                self.file.seek(0)
+                header = self.file.read(HEADER.size)
+                size = os.fstat(self.file.fileno()).st_size
+                existing = None
+                if len(header) == HEADER.size:
+                    magic, version, existing = HEADER.unpack(header)
+                    if (magic != MAGIC or version != VERSION or existing % WAYS
+                            or size != HEADER.size + existing * SLOT.size):
+                        existing = None
+                if existing:
+                    slots = existing
+                else:
+                    slots = max(WAYS, slots // WAYS * WAYS)
+                    size = HEADER.size + slots * SLOT.size
+                    self.file.truncate(0)
+                    self.file.write(HEADER.pack(MAGIC, VERSION, slots))
+                    self.file.truncate(size)
+                    self.file.flush()
+            self.map = mmap.mmap(self.file.fileno(), size)
+        except Exception:
+            self.file.close()
+            raise
+        self.slots = slots
+        self.buckets = slots // WAYS
+        self.hits = 0
+        self.misses = 0
+
+    def locked(self):
+        return _FileLock(self.file)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+            self.file.close()
+
+    def slot_offsets(self, key):
+        first = HEADER.size + (key % self.buckets) * WAYS * SLOT.size
+        return range(first, first + WAYS * SLOT.size, SLOT.size)
+
+    def read_slot(self, offset):
+        """Fields of the slot at offset, or None if it's empty or fails its checksum"""
+        raw = self.map[offset:offset + SLOT.size]
+        fields = SLOT.unpack(raw)
+        if fields[-1] != zlib.crc32(raw[:-4]) or not any(raw):
+            return None
+        return fields
+
+    def probe(self, key, config, depth):
+        """(column, score, depth) searched at least `depth` deep for key, or None"""
+        geometry = (config.rows, config.cols, config.connect_n, config.ai_piece)
+        for offset in self.slot_offsets(key):
+            fields = self.read_slot(offset)
+            if fields is not None and fields[0] == key and fields[1:5] == geometry and fields[5] >= depth:
+                self.hits += 1
+                return fields[6], fields[7], fields[5]
+        self.misses += 1
+        return None
+
+    def store(self, key, config, depth, column, score):
+        geometry = (config.rows, config.cols, config.connect_n, config.ai_piece)
+        payload = SLOT.pack(key, *geometry, depth, column, int(score), int(time.time()) & 0xFFFFFFFF, 0)[:-4]
+        entry = payload + struct.pack('<I', zlib.crc32(payload))
+        with self.locked():
+            victim = None
+            victim_rank = None
+            for offset in self.slot_offsets(key):
+                fields = self.read_slot(offset)
+                if fields is None:
+                    rank = (-1, 0)  # Empty or unreadable slots go first
+                elif fields[0] == key and fields[1:5] == geometry:
+                    if fields[5] > depth:
+                        return  # Keep the deeper result
+                    victim = offset
+                    break
+                else:
+                    rank = (fields[5], fields[8])  # Then the shallowest, then the oldest
+                if victim_rank is None or rank < victim_rank:
+                    victim, victim_rank = offset, rank
+            self.map[victim:victim + SLOT.size] = entry
+
+
+class _FileLock:
+    """Exclusive flock on an open file for the length of a with block"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
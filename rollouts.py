@@ -0,0 +1,165 @@
+import numpy as np
+
+from bitboard import BitBoard
+from geometry import get_geometry
+
+
+class BatchPlayouts:
+    """Many random playouts at once, stepped together in NumPy
+
+    The games are a (batch, rows, cols) int8 array; they can all start from
+    one position (run) or each from its own (run_many). Every step picks a
+    random non-full column for each unfinished game and drops the piece of
+    that game's side to move into it, so a step costs a handful of array
+    operations however large the batch is. Wins are found from per-window
+    piece counts: the start positions' are batched window sums (a
+    convolution of each line direction with a connect_n long kernel), and a
+    drop then only bumps the windows through its cell. Like BitBoard, a
+    column takes pieces while its top cell is empty, and a drop lands on its
+    lowest empty cell.
+    """
+
+    def __init__(self, rows, cols, connect_n, seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.connect_n = connect_n
+        self.cells = rows * cols
+        self.rng = np.random.default_rng(seed)
+
+        # Windows through each cell, padded to the same count by repeating the
+        # cell's first one; a repeat is read and written with the same value.
+        # Boards too small for a line have no windows and never need checking.
+        geometry = get_geometry(rows, cols, connect_n)
+        self.windows = geometry.windows
+        width = max(len(indices) for indices in geometry.cell_windows) if len(self.windows) else 0
+        self.cell_windows = np.zeros((self.cells, width), dtype=np.intp)
+        for cell, indices in enumerate(geometry.cell_windows):
+            if indices:
+                self.cell_windows[cell] = indices[0]
+                self.cell_windows[cell, :len(indices)] = indices
+
+    def window_counts(self, games, piece):
+        """(batch, windows) pieces of piece in every window"""
+        return (games.reshape(len(games), -1)[:, self.windows] == piece).sum(axis=2, dtype=np.int8)
+
+    def has_line(self, games, piece):
+        """Per game, whether piece fills any window anywhere on the board"""
+        return (self.window_counts(games, piece) == self.connect_n).any(axis=1)
+
+    def run(self, board, to_move, batch=1024, max_plies=None):
+        """Play batch random games from one position with to_move to move
+
+        board is a BitBoard or a (rows, cols) array. Returns (winners, plies,
+        games) like run_many.
+        """
+        if isinstance(board, BitBoard):
+            board = board.to_array(np.int8)
+        games = np.broadcast_to(np.asarray(board, dtype=np.int8), (batch, self.rows, self.cols))
+        return self.run_many(games, np.full(batch, to_move, dtype=np.int8), max_plies)
+
+    def run_many(self, games, to_move, max_plies=None):
+        """Play one random game from each of a (batch, rows, cols) stack of positions
+
+        to_move holds the side to move of every game. Returns (winners, plies,
+        games): for every game the piece that completed a line, or 0 for a
+        draw or a game still open after max_plies plies; the plies each game
+        took; and the final boards, as a new int8 array.
+        """
+        rows, cols = self.rows, self.cols
+        games = np.array(games, dtype=np.int8, order='C').reshape(-1, rows, cols)
+        batch = len(games)
+        flat = games.reshape(batch, self.cells)
+        piece = np.array(to_move, dtype=np.int8)
+        winners = np.zeros(batch, dtype=np.int8)
+        plies = np.zeros(batch, dtype=np.int32)
+
+        # Window counts of both pieces, one row per game and piece; games
+        # that are already decided are finished before the first step
+        counts = np.concatenate([self.window_counts(games, 1), self.window_counts(games, 2)])
+        stride = counts.shape[1]
+        for decided in (1, 2):
+            lines = (counts[(decided - 1) * batch:decided * batch] == self.connect_n).any(axis=1)
+            winners[lines & (winners == 0)] = decided
+        counts = counts.reshape(-1)
+
+        # Drops fill a column's empty cells bottom up, so the k-th drop into a
+        # column lands on its k-th lowest empty cell of the start position
+        empty = games == 0
+        bottom_up = np.where(empty, 0, rows) + np.arange(rows - 1, -1, -1)[:, None]
+        landing_rows = np.argsort(bottom_up, axis=1, kind='stable')  # (batch, rows, cols), empty rows first
+        landing = (landing_rows * cols + np.arange(cols)).transpose(0, 2, 1).reshape(-1)  # game, col, k -> cell
+        capacity = np.where(empty[:, 0, :], empty.sum(axis=1), 0)  # Drops each column takes before its top is filled
+
+        # State of the unfinished games, compacted whenever some finish so a
+        # step never touches finished ones
+        active = np.flatnonzero(winners == 0)
+        capacity = capacity[active]
+        remaining = capacity.sum(axis=1)  # Drops left before every column is full
+        filled = np.zeros((len(active), cols), dtype=capacity.dtype)
+        mover = piece[active].astype(np.intp)
+        flat = flat.reshape(-1)
+        check_lines = self.cell_windows.shape[1] > 0
+        ply = 0
+        while len(active) and (max_plies is None or ply < max_plies):
+            # Games with every column full are drawn
+            if not remaining.all():
+                playable = remaining > 0
+                active, capacity, remaining, filled, mover = (
+                    active[playable], capacity[playable], remaining[playable], filled[playable], mover[playable])
+                if not len(active):
+                    break
+
+            col = self.random_columns(filled, capacity)
+            slot = np.arange(len(active)) * cols + col
+            drops = filled.reshape(-1)[slot]
+            filled.reshape(-1)[slot] = drops + 1
+            remaining -= 1
+            cell = landing[(active * cols + col) * rows + drops]
+            flat[active * self.cells + cell] = mover
+            plies[active] += 1
+
+            # Only windows through the new piece change, and only they can be full now.
+            # Flat indices into the count array are much faster than 2-D fancy indexing.
+            if check_lines:
+                index = ((mover - 1) * batch + active)[:, None] * stride + self.cell_windows[cell]
+                window_count = np.take(counts, index) + 1
+                counts[index] = window_count
+                won = (window_count == self.connect_n).any(axis=1)
+                if won.any():
+                    winners[active[won]] = mover[won]
+                    unfinished = ~won
+                    active, capacity, remaining, filled, mover = (
+                        active[unfinished], capacity[unfinished], remaining[unfinished], filled[unfinished],
+                        mover[unfinished])
+            mover = 3 - mover
+            ply += 1
+        return winners, plies, games
+
+    def random_columns(self, filled, capacity):
+        """A uniformly random open column for every game, each having at least one
+
+        Columns are drawn at random and drawn again where they're full; the few
+        games still without one after some rounds pick by random keys instead.
+        """
+        games, cols = filled.shape
+        filled, capacity = filled.reshape(-1), capacity.reshape(-1)
+        base = np.arange(games) * cols
+        col = self.rng.integers(0, cols, games)
+        retry = np.flatnonzero(filled[base + col] >= capacity[base + col])
+        for _ in range(4):
+            if not len(retry):
+                return col
+            col[retry] = self.rng.integers(0, cols, len(retry))
+            slots = base[retry] + col[retry]
+            retry = retry[filled[slots] >= capacity[slots]]
+        if len(retry):
+            open_columns = filled.reshape(games, cols)[retry] < capacity.reshape(games, cols)[retry]
+            keys = self.rng.random(open_columns.shape)
+            keys[~open_columns] = -1.0
+            col[retry] = keys.argmax(axis=1)
+        return col
+
+    def win_probability(self, board, piece, to_move, batch=1024, max_plies=None):
+        """Share of random playouts piece wins, counting draws and unfinished games as half"""
+        winners = self.run(board, to_move, batch, max_plies)[0]
+        return (np.count_nonzero(winners == piece) + 0.5 * np.count_nonzero(winners == 0)) / batch
@@ -0,0 +1,482 @@
+import math
+import time
+
+import numpy as np
+
+from evaluation import get_evaluator
+from movegen import MoveGenerator, PowerUps
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+
+class SearchResult:
+    """Best move of an iterative deepening search and how much work went into it"""
+
+    def __init__(self, column, score, depth, nodes, elapsed, principal_variation, completed, row=None,
+                 powerup=None):
+        self.column = column
+        self.row = row  # Set when the best move is a gravity off placement
+        self.powerup = powerup  # 'column_remover' when the best move clears column instead
+        self.score = score
+        self.depth = depth  # Deepest iteration that produced the move
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.principal_variation = principal_variation
+        self.completed = completed  # False if the last iteration was cut short by the deadline
+
+    def __repr__(self):
+        move = f"column={self.column}"
+        if self.row is not None:
+            move += f", row={self.row}"
+        if self.powerup is not None:
+            move += f", powerup={self.powerup}"
+        return (f"SearchResult({move}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, elapsed={self.elapsed:.2f}s, pv={self.principal_variation})")
+
+
+class SearchStats:
+    """What the search did for one AI move, collected only when Searcher.stats is set"""
+
+    FIELDS = ('nodes', 'leaf_evals', 'beta_cutoffs', 'first_move_cutoffs', 'tt_probes', 'tt_hits', 'timeouts',
+              'depth', 'playouts', 'elapsed')
+
+    def __init__(self):
+        self.nodes = 0
+        self.leaf_evals = 0  # Depth-zero positions scored by the evaluator
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0  # Cutoffs caused by the first move tried, a measure of ordering quality
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.timeouts = 0
+        self.depth = 0  # Deepest completed (or partially kept) search depth
+        self.playouts = 0  # Monte Carlo playouts, for Expert moves
+        self.elapsed = 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def as_dict(self):
+        stats = {field: getattr(self, field) for field in self.FIELDS}
+        stats['first_move_cutoff_rate'] = self.first_move_cutoff_rate
+        stats['tt_hit_rate'] = self.tt_hit_rate
+        return stats
+
+    @property
+    def playouts_per_second(self):
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def summary_lines(self):
+        if self.playouts:
+            return [
+                f"Nodes: {self.nodes}  Depth: {self.depth}",
+                f"Playouts: {self.playouts} ({self.playouts_per_second:.0f}/s)",
+                f"Time: {self.elapsed:.2f}s",
+            ]
+        return [
+            f"Nodes: {self.nodes}  Leaves: {self.leaf_evals}  Depth: {self.depth}",
+            f"Cutoffs: {self.beta_cutoffs}  First move: {self.first_move_cutoff_rate:.0%}",
+            f"TT hits: {self.tt_hits}/{self.tt_probes} ({self.tt_hit_rate:.0%})  Timeouts: {self.timeouts}",
+            f"Time: {self.elapsed:.2f}s",
+        ]
+
+    def __repr__(self):
+        return "SearchStats(" + ", ".join(f"{field}={getattr(self, field)}" for field in self.FIELDS) + ")"
+
+
+class Searcher:
+    """Alpha-beta search over a BitBoard, independent of the pygame game
+
+    Keeps everything that should survive between searches: the transposition
+    table, killer moves, the history table and the last principal variation.
+    Scores are from the AI's point of view (the maximizing player).
+    """
+
+    def __init__(self, rows, cols, connect_n, player_piece=1, ai_piece=2, table_size=1 << 18, think_time=3.0):
+        self.rows = rows
+        self.cols = cols
+        self.connect_n = connect_n
+        self.player_piece = player_piece
+        self.ai_piece = ai_piece
+        self.think_time = think_time  # Seconds before minimax raises TimeoutError
+        self.evaluator = get_evaluator(rows, cols, connect_n, player_piece, ai_piece)
+        self.transposition_table = TranspositionTable(table_size)
+        self.nodes_searched = 0  # Nodes visited by the last search
+        self.log_nodes = False  # Count nodes per ply into nodes_per_ply
+        self.nodes_per_ply = []
+        self.move_ordering = True  # Try PV, TT, killer, history and center moves first
+        self.killer_moves = {}  # ply -> up to two columns that recently caused a cutoff
+        self.history_table = [[0] * cols for _ in range(3)]  # [piece][col] cutoff scores
+        self.principal_variation = []  # Best line from the previous iterative deepening iteration
+        self.stats = None  # SearchStats to fill in, or None to skip collecting them
+        self.stop_check = None  # Callable polled every 1024 nodes; True stops the search like a timeout
+        self.powerups = None  # PowerUps held at the root, or None to search drops only
+        self.powerup_plies = 3  # Plies from the root where moves spending power-ups are searched
+        self.move_generator = MoveGenerator(self.evaluator)
+        self.root_ply = 0  # Moves in the searched board's history at the root; plies count from there
+
+    def reset(self):
+        """Forget everything learned in the current game"""
+        self.transposition_table.clear()
+        self.killer_moves = {}
+        self.history_table = [[0] * self.cols for _ in range(3)]
+        self.principal_variation = []
+
+    def start_search(self, sim_board=None):
+        """Reset per-move search state before a new AI decision from sim_board"""
+        self.root_ply = len(sim_board.history) if sim_board is not None else 0
+        self.transposition_table.new_search()
+        self.nodes_searched = 0
+        self.nodes_per_ply = []
+        self.killer_moves = {}
+        # Keep history from earlier moves, but let recent cutoffs dominate
+        for scores in self.history_table:
+            for col in range(self.cols):
+                scores[col] //= 2
+
+    def evaluate(self, sim_board):
+        # Search boards carry an incrementally updated score, so leaves cost O(1)
+        if sim_board.evaluation is not None and sim_board.evaluation.piece == self.ai_piece:
+            return sim_board.evaluation.score
+        return self.evaluator.score(sim_board.to_array(np.intp), self.ai_piece)
+
+    def minimax(self, depth, alpha, beta, maximizing_player, start_time, sim_board):
+        # sim_board is a single working board: children make a move and undo it on return
+        self.nodes_searched += 1
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+        if self.log_nodes:
+            ply = self.ply(sim_board)
+            while len(self.nodes_per_ply) <= ply:
+                self.nodes_per_ply.append(0)
+            self.nodes_per_ply[ply] += 1
+
+        # Check if we're out of time
+        if time.time() - start_time > self.think_time:
+            if stats is not None:
+                stats.timeouts += 1
+            raise TimeoutError("AI thinking took too long")
+        if self.stop_check is not None and not self.nodes_searched & 1023 and self.stop_check():
+            raise TimeoutError("Search stopped")
+
+        # Get valid locations for the simulated board
+        valid_locations = sim_board.valid_columns()
+
+        # Check for terminal condition in simulated board (winner is cached on each move)
+        ai_won = sim_board.winner == self.ai_piece
+        player_won = sim_board.winner == self.player_piece
+        is_terminal = ai_won or player_won or len(valid_locations) == 0
+
+        if depth == 0 or is_terminal:
+            if is_terminal:
+                if ai_won:
+                    return (None, 1000000)
+                elif player_won:
+                    return (None, -1000000)
+                else:  # Game is over, no more valid moves
+                    return (None, 0)
+            else:  # Depth is zero
+                if stats is not None:
+                    stats.leaf_evals += 1
+                return (None, self.evaluate(sim_board))
+
+        # Reuse earlier results for this position if they were searched deep enough
+        table = self.transposition_table
+        key = self.node_key(sim_board, maximizing_player)
+        entry = table.probe(key)
+        tt_move = entry[4] if entry is not None else None
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += entry is not None
+        if entry is not None and entry[1] >= depth:
+            _, _, bound, stored_value, stored_move, _ = entry
+            if bound == EXACT:
+                return stored_move, stored_value
+            elif bound == LOWER:
+                alpha = max(alpha, stored_value)
+            else:
+                beta = min(beta, stored_value)
+            if alpha >= beta:
+                return stored_move, stored_value
+
+        column, value = self.search_children(depth, alpha, beta, maximizing_player, start_time, sim_board,
+                                             valid_locations, tt_move)
+
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        table.store(key, depth, bound, value, column)
+        return column, value
+
+    def search_children(self, depth, alpha, beta, maximizing_player, start_time, sim_board, valid_locations,
+                        tt_move=None):
+        ply = self.ply(sim_board)
+
+        pv_move = self.pv_move_at(sim_board, ply) if self.principal_variation else None
+
+        powerups = self.powerups
+        if powerups is not None and ply < self.powerup_plies:
+            if powerups.holds_any(self.ai_piece if maximizing_player else self.player_piece):
+                return self.search_powerup_children(depth, alpha, beta, maximizing_player, start_time, sim_board,
+                                                    valid_locations, tt_move, ply, pv_move)
+
+        if maximizing_player:
+            moves = self.order_moves(valid_locations, tt_move, ply, self.ai_piece, pv_move)
+            value = -math.inf
+            column = moves[0] if moves else None
+
+            for col in moves:
+                # Make the move on the simulated board and take it back afterwards
+                row = sim_board.drop(col, self.ai_piece)
+                if row != -1:
+                    try:
+                        new_score = self.minimax(depth-1, alpha, beta, False, start_time, sim_board)[1]
+                    finally:
+                        sim_board.undo()
+
+                    if new_score > value:
+                        value = new_score
+                        column = col
+                    alpha = max(alpha, value)
+                    if alpha >= beta:
+                        self.record_cutoff(col, ply, depth, self.ai_piece, col == moves[0])
+                        break
+            return column, value
+
+        else:  # Minimizing player
+            moves = self.order_moves(valid_locations, tt_move, ply, self.player_piece, pv_move)
+            value = math.inf
+            column = moves[0] if moves else None
+
+            for col in moves:
+                # Make the move on the simulated board and take it back afterwards
+                row = sim_board.drop(col, self.player_piece)
+                if row != -1:
+                    try:
+                        new_score = self.minimax(depth-1, alpha, beta, True, start_time, sim_board)[1]
+                    finally:
+                        sim_board.undo()
+
+                    if new_score < value:
+                        value = new_score
+                        column = col
+                    beta = min(beta, value)
+                    if alpha >= beta:
+                        self.record_cutoff(col, ply, depth, self.player_piece, col == moves[0])
+                        break
+            return column, value
+
+    def search_powerup_children(self, depth, alpha, beta, maximizing_player, start_time, sim_board,
+                                valid_locations, tt_move, ply, pv_move):
+        """search_children for a mover holding power-ups, over every MoveGenerator move
+
+        Drops keep their usual order and come first, so most nodes cut off
+        before the placements and removals are even generated. Returns the
+        best move as a column if it's a drop, else as a (col, row, powerup)
+        tuple.
+        """
+        piece = self.ai_piece if maximizing_player else self.player_piece
+        drops = self.order_moves(valid_locations, tt_move, ply, piece, pv_move)
+        first = tt_move if isinstance(tt_move, tuple) else None
+        generator = self.move_generator
+        powerups = self.powerups
+        value = -math.inf if maximizing_player else math.inf
+        best_move = first_move = None
+
+        for move in generator.moves(sim_board, piece, drops, powerups, first):
+            if first_move is None:
+                first_move = move
+            generator.make(sim_board, move, piece, powerups)
+            try:
+                new_score = self.minimax(depth-1, alpha, beta, not maximizing_player, start_time, sim_board)[1]
+            finally:
+                generator.unmake(sim_board, move, piece, powerups)
+
+            if maximizing_player:
+                if new_score > value:
+                    value, best_move = new_score, move
+                alpha = max(alpha, value)
+            else:
+                if new_score < value:
+                    value, best_move = new_score, move
+                beta = min(beta, value)
+            if alpha >= beta:
+                if move[1] is None and move[2] is None:
+                    self.record_cutoff(move[0], ply, depth, piece, move == first_move)
+                elif self.stats is not None:
+                    self.stats.beta_cutoffs += 1
+                    self.stats.first_move_cutoffs += move == first_move
+                break
+        return self.table_move(best_move), value
+
+    def table_move(self, move):
+        """How a move is stored in the table and the PV: a drop as its column, anything else as the tuple"""
+        if move is not None and move[1] is None and move[2] is None:
+            return move[0]
+        return move
+
+    def node_key(self, sim_board, maximizing_player):
+        """Transposition key of a node; power-ups count only at the plies where they're searched"""
+        key = sim_board.position_key(maximizing_player)
+        if self.powerups is not None and self.ply(sim_board) < self.powerup_plies:
+            key ^= self.powerups.key
+        return key
+
+    def order_moves(self, valid_locations, tt_move, ply, piece, pv_move=None):
+        """PV and transposition table moves first, then killers, then history scores, then center distance"""
+        if not self.move_ordering:
+            return valid_locations
+        killers = self.killer_moves.get(ply, ())
+        history = self.history_table[piece]
+        center = (self.cols - 1) / 2
+
+        def priority(col):
+            if col == pv_move:
+                return (0, 0, 0)
+            if col == tt_move:
+                return (0, 1, 0)
+            if col in killers:
+                return (1, killers.index(col), 0)
+            return (2, -history[col], abs(col - center))
+
+        return sorted(valid_locations, key=priority)
+
+    def record_cutoff(self, col, ply, depth, piece, first_move=False):
+        """Remember a move that caused a beta cutoff as a killer and in the history table"""
+        if self.stats is not None:
+            self.stats.beta_cutoffs += 1
+            self.stats.first_move_cutoffs += first_move
+        killers = self.killer_moves.setdefault(ply, [])
+        if col not in killers:
+            killers.insert(0, col)
+            del killers[2:]
+        self.history_table[piece][col] += depth * depth
+
+    def ply(self, sim_board):
+        """Moves made on sim_board since the root of the current search"""
+        return len(sim_board.history) - self.root_ply
+
+    def pv_move_at(self, sim_board, ply):
+        """Column the previous principal variation plays here, if this node is on it"""
+        pv = self.principal_variation
+        if ply >= len(pv):
+            return None
+        history = sim_board.history
+        for i in range(ply):
+            if history[self.root_ply + i][1] % self.cols != pv[i]:
+                return None
+        return pv[ply]
+
+    def extract_pv(self, sim_board, first_move, depth, maximizing_player=True):
+        """Follow best moves through the transposition table to rebuild the principal variation
+
+        The PV is a list of columns; it ends at the first move that spends a
+        power-up, which is kept as its (col, row, powerup) tuple.
+        """
+        if isinstance(first_move, tuple):
+            return [first_move]
+        pv = []
+        col = first_move
+        while isinstance(col, int) and len(pv) < depth and sim_board.is_valid_column(col):
+            sim_board.drop(col, self.ai_piece if maximizing_player else self.player_piece)
+            pv.append(col)
+            maximizing_player = not maximizing_player
+            if sim_board.winner is not None:
+                break
+            entry = self.transposition_table.probe(self.node_key(sim_board, maximizing_player))
+            col = entry[4] if entry is not None else None
+        for _ in pv:
+            sim_board.undo()
+        return pv
+
+    def search_root(self, depth, start_time, sim_board):
+        """One iterative deepening iteration at the root
+
+        Root moves are searched one at a time, so when the deadline hits part way
+        through, the best move found so far is kept as long as the previous
+        iteration's best move (always searched first) has been finished.
+        With self.powerups set, the AI's moves spending them are searched too.
+        Returns (move, value, completed), the move as in table_move.
+        """
+        valid_locations = sim_board.valid_columns()
+        if not valid_locations or sim_board.winner is not None:
+            return None, 0, True
+
+        key = self.node_key(sim_board, True)
+        entry = self.transposition_table.probe(key)
+        tt_move = entry[4] if entry is not None else None
+        previous_best = self.principal_variation[0] if self.principal_variation else None
+        drops = self.order_moves(valid_locations, tt_move, 0, self.ai_piece, previous_best)
+        first = previous_best if previous_best is not None else tt_move
+        if first is not None and not isinstance(first, tuple):
+            first = (first, None, None)
+        powerups = self.powerups if self.powerups is not None else PowerUps()
+        generator = self.move_generator
+
+        alpha, beta = -math.inf, math.inf
+        best_move, best_value = None, -math.inf
+        first_move = None
+        for move in generator.moves(sim_board, self.ai_piece, drops, powerups, first):
+            if first_move is None:
+                first_move = move
+            generator.make(sim_board, move, self.ai_piece, powerups)
+            try:
+                value = self.minimax(depth-1, alpha, beta, False, start_time, sim_board)[1]
+            except TimeoutError:
+                if best_move is not None and previous_best is not None and first_move == first:
+                    return self.table_move(best_move), best_value, False
+                raise
+            finally:
+                generator.unmake(sim_board, move, self.ai_piece, powerups)
+
+            if value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+
+        best_move = self.table_move(best_move)
+        self.transposition_table.store(key, depth, EXACT, best_value, best_move)
+        return best_move, best_value, True
+
+    def iterative_deepening(self, max_depth, sim_board):
+        """Search depth 1, 2, ... until max_depth or the time budget runs out"""
+        start_time = time.time()
+        self.start_search(sim_board)
+        self.principal_variation = []
+        result = SearchResult(None, None, 0, 0, 0.0, [], True)
+
+        for current_depth in range(1, max_depth + 1):
+            nodes_before = self.nodes_searched
+            self.nodes_per_ply = []
+            try:
+                move, score, completed = self.search_root(current_depth, start_time, sim_board)
+            except TimeoutError:
+                result.completed = False
+                break
+
+            if move is not None:
+                self.principal_variation = self.extract_pv(sim_board, move, current_depth)
+                col, row, powerup = move if isinstance(move, tuple) else (move, None, None)
+                result = SearchResult(col, score, current_depth, 0, 0.0, self.principal_variation, completed, row,
+                                      powerup)
+                if self.stats is not None:
+                    self.stats.depth = current_depth
+
+            if self.log_nodes:
+                print(f"Depth {current_depth}: {self.nodes_searched - nodes_before} nodes, "
+                      f"per ply {self.nodes_per_ply}")
+
+            # If we're running out of time, stop deepening
+            if not completed or move is None or time.time() - start_time > self.think_time * 0.8:
+                break
+
+        result.nodes = self.nodes_searched
+        result.elapsed = time.time() - start_time
+        return result
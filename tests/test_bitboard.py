@@ -0,0 +1,71 @@
+"""BitBoard against a plain (rows, cols) array on random games"""
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BitBoard  # noqa: E402
+
+
+def array_next_open_row(board, col):
+    for row in range(board.shape[0] - 1, -1, -1):
+        if board[row][col] == 0:
+            return row
+    return -1
+
+
+def array_has_won(board, piece, n):
+    """Scan every line of n cells in all four directions"""
+    rows, cols = board.shape
+    for r in range(rows):
+        for c in range(cols):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                end_r, end_c = r + dr * (n - 1), c + dc * (n - 1)
+                if 0 <= end_r < rows and end_c < cols and all(board[r + dr * i][c + dc * i] == piece
+                                                               for i in range(n)):
+                    return True
+    return False
+
+
+def test_drops_and_wins_match_the_array():
+    rng = random.Random(1)
+    for rows, cols, n, games in ((6, 7, 4, 20), (10, 16, 8, 5), (19, 23, 8, 2)):
+        for _ in range(games):
+            bitboard = BitBoard(rows, cols, n)
+            board = np.zeros((rows, cols), dtype=np.intp)
+            piece = 1
+            while bitboard.winner is None:
+                valid = [col for col in range(cols) if board[0][col] == 0]
+                assert bitboard.valid_columns() == valid
+                if not valid:
+                    break
+                col = rng.choice(valid)
+                row = array_next_open_row(board, col)
+                assert bitboard.next_open_row(col) == row
+                assert bitboard.drop(col, piece) == row
+                board[row][col] = piece
+                # Only the mover's lines can change
+                assert (bitboard.winner == piece) == array_has_won(board, piece, n)
+                piece = 3 - piece
+            assert (bitboard.to_array(np.intp) == board).all()
+            for p in (1, 2):
+                assert bitboard.has_won(p) == array_has_won(board, p, n)
+
+
+def test_gravity_off_placements_match_the_array():
+    rng = random.Random(2)
+    rows, cols, n = 10, 16, 8
+    for _ in range(5):
+        bitboard = BitBoard(rows, cols, n)
+        board = np.zeros((rows, cols), dtype=np.intp)
+        for turn in range(60):
+            row, col = rng.choice(bitboard.empty_cells())
+            bitboard.place(row, col, 1 + turn % 2)
+            board[row][col] = 1 + turn % 2
+            assert bitboard.has_won(1 + turn % 2) == array_has_won(board, 1 + turn % 2, n)
+        assert (bitboard.to_array(np.intp) == board).all()
+        rebuilt = BitBoard.from_array(board, n)
+        assert rebuilt.bits == bitboard.bits and rebuilt.hash == bitboard.hash
@@ -0,0 +1,20 @@
+"""Engine move selection on hand-built positions"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import BoardConfig, Engine  # noqa: E402
+
+
+def test_gravity_off_blocks_the_reachable_win_before_a_floating_one():
+    # The player wins by dropping into col 7 (row 9) or, some day, by filling row 5 col 7
+    engine = Engine(BoardConfig(10, 16, 8))
+    cells = np.zeros((10, 16), dtype=np.intp)
+    cells[9, 0:7] = 1
+    cells[5, 8:15] = 1
+    board = engine.board_from_array(cells)
+    assert engine.forced_move(board, gravity_off=True) == (7, 9)
+    assert engine.hard_move(board, gravity_off=True) == (7, None, None)
@@ -0,0 +1,101 @@
+"""Parity of the vectorized WindowEvaluator with the original list-based window scoring"""
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation import EvalState, get_evaluator  # noqa: E402
+
+CONNECT_N = 8
+
+
+def evaluate_window(window, piece, connect_n):
+    """Connect8Game.evaluate_window as main.py had it before evaluation.py, kept frozen as the reference"""
+    score = 0
+    opp_piece = 3 - piece
+
+    if window.count(piece) == connect_n:
+        score += 1000000  # Winning move
+    elif window.count(piece) == connect_n - 1 and window.count(0) == 1:
+        score += 50000  # Almost winning (n-1 in a row)
+    elif window.count(piece) == connect_n - 2 and window.count(0) == 2:
+        score += 10000  # n-2 in a row
+    elif window.count(piece) == connect_n - 3 and window.count(0) == 3:
+        score += 1000   # n-3 in a row
+    elif window.count(piece) == connect_n - 4 and window.count(0) == 4:
+        score += 100    # n-4 in a row
+    elif window.count(piece) >= 3:
+        score += 10     # 3 in a row
+    elif window.count(piece) >= 2:
+        score += 2      # 2 in a row
+
+    if window.count(opp_piece) == connect_n - 1 and window.count(0) == 1:
+        score -= 50000  # Block opponent's almost win
+    elif window.count(opp_piece) == connect_n - 2 and window.count(0) == 2:
+        score -= 10000  # Block opponent's n-2 in a row
+
+    return score
+
+
+def list_score(board, piece, n):
+    """score_position as main.py computed it before evaluation.py: every window as a list"""
+    rows, cols = board.shape
+    score = 0
+    for center_col in (cols // 2 - 1, cols // 2):
+        if center_col < cols:
+            score += [int(board[r][center_col]) for r in range(rows)].count(piece) * 3
+    for r in range(rows):
+        for c in range(cols - n + 1):
+            score += evaluate_window([int(board[r][c + i]) for i in range(n)], piece, n)
+    for c in range(cols):
+        for r in range(rows - n + 1):
+            score += evaluate_window([int(board[r + i][c]) for i in range(n)], piece, n)
+    for r in range(rows - n + 1):
+        for c in range(cols - n + 1):
+            score += evaluate_window([int(board[r + i][c + i]) for i in range(n)], piece, n)
+    for r in range(n - 1, rows):
+        for c in range(cols - n + 1):
+            score += evaluate_window([int(board[r - i][c + i]) for i in range(n)], piece, n)
+    return score
+
+
+def random_board(rows, cols, rng):
+    """A board of random drops, so pieces rest on each other like in a game"""
+    board = np.zeros((rows, cols), dtype=np.intp)
+    heights = [0] * cols
+    for turn in range(rng.randrange(rows * cols)):
+        col = rng.randrange(cols)
+        if heights[col] < rows:
+            board[rows - 1 - heights[col], col] = 1 + turn % 2
+            heights[col] += 1
+    return board
+
+
+@pytest.mark.parametrize('rows, cols', [(10, 16), (14, 20), (19, 23)])
+def test_window_evaluator_matches_evaluate_window(rows, cols):
+    evaluator = get_evaluator(rows, cols, CONNECT_N, 1, 2)
+    rng = random.Random(f"evaluation-{rows}x{cols}")
+    for _ in range(20):
+        board = random_board(rows, cols, rng)
+        for piece in (1, 2):
+            assert evaluator.score(board, piece) == list_score(board, piece, CONNECT_N)
+
+
+@pytest.mark.parametrize('rows, cols, connect_n', [(6, 7, 4), (10, 16, 8)])
+def test_eval_state_tracks_rescore_from_empty_board(rows, cols, connect_n):
+    evaluator = get_evaluator(rows, cols, connect_n, 1, 2)
+    rng = random.Random(f"eval-state-{rows}x{cols}")
+    for piece in (1, 2):
+        state = EvalState(evaluator, piece)
+        board = np.zeros((rows, cols), dtype=np.intp)
+        assert state.score == evaluator.score(board, piece)
+        for turn in range(rows * cols // 2):
+            row, col = rng.randrange(rows), rng.randrange(cols)
+            if board[row, col] == 0:
+                board[row, col] = 1 + turn % 2
+                state.add(row * cols + col, 1 + turn % 2)
+                assert state.score == evaluator.score(board, piece)
@@ -0,0 +1,70 @@
+"""MoveGenerator.make and unmake restore the whole search state"""
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BitBoard  # noqa: E402
+from evaluation import EvalState, get_evaluator  # noqa: E402
+from movegen import POWERUPS, MoveGenerator, PowerUps  # noqa: E402
+
+
+def snapshot(board, powerups):
+    return (board.bits[:], board.hash, board.winner, len(board.history),
+            board.evaluation.score, board.evaluation.codes[:], set(powerups.held), powerups.key)
+
+
+@pytest.mark.parametrize('rows, cols, connect_n', [(6, 7, 4), (10, 16, 8)])
+def test_unmake_restores_make(rows, cols, connect_n):
+    evaluator = get_evaluator(rows, cols, connect_n, 1, 2)
+    generator = MoveGenerator(evaluator)
+    rng = random.Random(f"movegen-{rows}x{cols}")
+    spent = 0
+    for _ in range(10):
+        board = BitBoard(rows, cols, connect_n)
+        board.evaluation = EvalState(evaluator, 2)
+        for turn in range(rng.randrange(rows * cols // 2)):
+            board.drop(rng.choice(board.valid_columns()), 1 + turn % 2)
+        powerups = PowerUps((piece, powerup) for piece in (1, 2) for powerup in POWERUPS)
+        empty_key = PowerUps().key
+
+        played = []
+        piece = 1 + len(board.history) % 2
+        while board.winner is None and board.valid_columns():
+            moves = list(generator.moves(board, piece, board.valid_columns(), powerups))
+            spending = [move for move in moves if move[1] is not None or move[2] is not None]
+            move = rng.choice(spending if spending and rng.random() < 0.5 else moves)
+            before = snapshot(board, powerups)
+            generator.make(board, move, piece, powerups)
+            played.append((move, piece, before))
+            assert board.evaluation.score == evaluator.score(board.to_array(np.intp), 2)
+            assert board.winner == (2 if board.has_won(2) else 1 if board.has_won(1) else None)
+            piece = 3 - piece
+        spent += 4 - len(powerups.held)
+
+        for move, piece, before in reversed(played):
+            generator.unmake(board, move, piece, powerups)
+            assert snapshot(board, powerups) == before
+        assert powerups.key != empty_key and len(powerups.held) == 4
+    assert spent  # Power-up moves were made and unmade, not just drops
+
+
+def test_clear_column_undo_round_trips():
+    evaluator = get_evaluator(10, 16, 8, 1, 2)
+    rng = random.Random("clear-column")
+    board = BitBoard(10, 16, 8)
+    board.evaluation = EvalState(evaluator, 2)
+    for turn in range(80):
+        board.drop(rng.choice(board.valid_columns()), 1 + turn % 2)
+    powerups = PowerUps()
+    for col in range(board.cols):
+        before = snapshot(board, powerups)
+        board.clear_column(col)
+        assert not any(board.get(row, col) for row in range(board.rows))
+        assert board.evaluation.score == evaluator.score(board.to_array(np.intp), 2)
+        board.undo()
+        assert snapshot(board, powerups) == before
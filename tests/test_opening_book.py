@@ -0,0 +1,60 @@
+"""Opening book files and mirror-normalized lookups"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BitBoard  # noqa: E402
+from opening_book import OpeningBook, book_key, load_book, write_book  # noqa: E402
+
+ROWS, COLS, CONNECT_N = 10, 16, 8
+
+
+def played(columns):
+    board = BitBoard(ROWS, COLS, CONNECT_N)
+    for ply, col in enumerate(columns):
+        board.drop(col, 1 + ply % 2)
+    return board
+
+
+def test_lookup_answers_a_position_and_its_mirror(tmp_path):
+    rng = random.Random(4)
+    entries = {}
+    positions = []
+    while len(positions) < 20:
+        columns = [rng.randrange(COLS) for _ in range(2 * rng.randrange(1, 4))]
+        board = played(columns)
+        if played([COLS - 1 - col for col in columns]).hash == board.hash:
+            continue  # A symmetric position has no distinct mirror to check
+        best = rng.randrange(COLS)
+        key, mirrored = book_key(board, 1)
+        entries[key] = COLS - 1 - best if mirrored else best
+        positions.append((columns, best))
+    path = str(tmp_path / 'book.book')
+    write_book(path, ROWS, COLS, CONNECT_N, 8, entries)
+    book = OpeningBook(path)
+
+    for columns, best in positions:
+        # Later positions with the same key overwrote earlier ones, so check against the stored entry
+        key, mirrored = book_key(played(columns), 1)
+        expected = COLS - 1 - entries[key] if mirrored else entries[key]
+        assert book.lookup(played(columns), 1) == expected
+        assert book.lookup(played([COLS - 1 - col for col in columns]), 1) == COLS - 1 - expected
+        assert book.lookup(played(columns), 2) is None  # Same cells with the other side to move
+
+
+def test_lookup_stops_after_the_book_plies(tmp_path):
+    board = played([7, 8, 7, 8])
+    path = str(tmp_path / 'book.book')
+    write_book(path, ROWS, COLS, CONNECT_N, 4, {book_key(board, 1)[0]: 3})
+    assert OpeningBook(path).lookup(board, 1) is None
+
+
+def test_unusable_book_files_are_ignored(tmp_path):
+    book_path = str(tmp_path / f'{ROWS}x{COLS}-connect{CONNECT_N}.book')
+    write_book(book_path, ROWS, COLS, CONNECT_N, 8, {1: 3})
+    assert load_book(ROWS, COLS, CONNECT_N, str(tmp_path)) is not None
+    with open(book_path, 'r+b') as f:
+        f.truncate(os.path.getsize(book_path) - 1)
+    assert load_book(ROWS, COLS, CONNECT_N, str(tmp_path)) is None
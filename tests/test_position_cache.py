@@ -0,0 +1,70 @@
+"""PositionCache entries, replacement and damaged slots"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import BoardConfig  # noqa: E402
+from position_cache import SLOT, WAYS, PositionCache  # noqa: E402
+
+CONFIG = BoardConfig(10, 16, 8)
+
+
+def test_stored_results_survive_reopening(tmp_path):
+    path = str(tmp_path / 'cache.bin')
+    cache = PositionCache(path, slots=64)
+    cache.store(12345, CONFIG, 5, 7, -300)
+    assert cache.probe(12345, CONFIG, 5) == (7, -300, 5)
+    assert cache.probe(12345, CONFIG, 6) is None  # Not searched deep enough
+    assert cache.probe(12345, BoardConfig(10, 17, 8), 5) is None  # Other grid size
+    cache.close()
+
+    cache = PositionCache(path, slots=1024)  # An existing file keeps its size
+    assert cache.slots == 64
+    assert cache.probe(12345, CONFIG, 5) == (7, -300, 5)
+    cache.close()
+
+
+def test_a_deeper_result_is_kept(tmp_path):
+    cache = PositionCache(str(tmp_path / 'cache.bin'), slots=64)
+    cache.store(99, CONFIG, 7, 3, 10)
+    cache.store(99, CONFIG, 5, 4, 20)
+    assert cache.probe(99, CONFIG, 5) == (3, 10, 7)
+    cache.store(99, CONFIG, 8, 5, 30)
+    assert cache.probe(99, CONFIG, 5) == (5, 30, 8)
+    cache.close()
+
+
+def test_a_full_bucket_drops_the_shallowest_entry(tmp_path):
+    cache = PositionCache(str(tmp_path / 'cache.bin'), slots=64)
+    keys = [bucket_key * cache.buckets + 3 for bucket_key in range(WAYS + 1)]  # All in bucket 3
+    for depth, key in enumerate(keys[:WAYS], start=2):
+        cache.store(key, CONFIG, depth, 1, 0)
+    cache.store(keys[WAYS], CONFIG, 9, 1, 0)
+    assert cache.probe(keys[0], CONFIG, 0) is None
+    assert all(cache.probe(key, CONFIG, 0) is not None for key in keys[1:])
+    cache.close()
+
+
+def test_a_damaged_slot_reads_as_a_miss(tmp_path):
+    cache = PositionCache(str(tmp_path / 'cache.bin'), slots=64)
+    cache.store(4242, CONFIG, 5, 2, 100)
+    offset = next(offset for offset in cache.slot_offsets(4242) if cache.read_slot(offset) is not None)
+    for index in range(SLOT.size):
+        original = cache.map[offset + index]
+        cache.map[offset + index] = original ^ 0x10  # Every single flipped byte fails the checksum
+        assert cache.probe(4242, CONFIG, 5) is None
+        cache.map[offset + index] = original
+    assert cache.probe(4242, CONFIG, 5) == (2, 100, 5)
+    cache.close()
+
+
+def test_a_file_with_a_bad_header_starts_over(tmp_path):
+    path = str(tmp_path / 'cache.bin')
+    with open(path, 'wb') as f:
+        f.write(b'not a cache file')
+    cache = PositionCache(path, slots=64)
+    assert cache.slots == 64 and cache.probe(1, CONFIG, 0) is None
+    cache.store(1, CONFIG, 3, 0, 0)
+    assert cache.probe(1, CONFIG, 0) == (0, 0, 3)
+    cache.close()
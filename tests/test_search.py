@@ -0,0 +1,33 @@
+"""Searcher results on positions reached by play"""
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import BoardConfig, Engine  # noqa: E402
+from movegen import PowerUps  # noqa: E402
+
+
+def played_board(engine, plies, seed):
+    board = engine.new_board()
+    rng = random.Random(seed)
+    for ply in range(plies):
+        board.drop(rng.choice(board.valid_columns()), 1 + ply % 2)
+    return board
+
+
+def test_search_does_not_depend_on_earlier_history():
+    for held in ([], [(2, 'gravity_off'), (2, 'column_remover')]):
+        results = []
+        for keep_history in (True, False):
+            engine = Engine(BoardConfig(10, 16, 8), think_time=math.inf)
+            board = played_board(engine, 20, 3)
+            if not keep_history:
+                board = engine.board_from_array(board.to_array())
+            result = engine.search(board, 4, PowerUps(held) if held else None)
+            results.append((result.column, result.row, result.powerup, result.score, result.nodes,
+                            result.principal_variation))
+            assert len(board.history) == (20 if keep_history else 0)
+        assert results[0] == results[1]
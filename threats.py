@@ -0,0 +1,88 @@
+import numpy as np
+
+
+class ThreatMap:
+    """Where each player can win, or make an open n-1 threat, with one gravity off placement
+
+    Built in one vectorized pass over the per-window (own, opp) codes that an
+    EvalState already keeps up to date, instead of trying every empty cell.
+    Cells are flat indices (row * cols + col).
+    """
+
+    def __init__(self, evaluator, board, piece):
+        n = evaluator.connect_n
+        windows = evaluator.windows
+        cells = evaluator.rows * evaluator.cols
+        self.evaluator = evaluator
+        self.piece = piece
+        self.opp_piece = next(other for other in evaluator.weights if other != piece)
+
+        if board.evaluation is not None and board.evaluation.piece == piece:
+            codes = np.array(board.evaluation.codes, dtype=np.intp)
+            score = board.evaluation.score
+        else:
+            array = board.to_array(np.intp)
+            codes = evaluator.window_codes(array, piece)
+            score = evaluator.score(array, piece)
+        self.empty = board.to_array(np.intp).ravel() == 0
+        own, opp = np.divmod(codes, n + 1)
+
+        self.wins = {}  # piece -> sorted cells that complete a line
+        self.threats = {}  # piece -> per-cell count of windows left one piece short of a line
+        self.win_windows = {}  # piece -> [(window, empty cell)] for every window one piece short of a line
+        self.threat_windows = {}  # piece -> set of windows two pieces short of a line with no opponent piece
+        for p, mine, theirs in ((piece, own, opp), (self.opp_piece, opp, own)):
+            open_windows = theirs == 0
+            winning_index = np.flatnonzero(open_windows & (mine == n - 1))
+            winning = windows[winning_index]
+            winning_cells = winning[self.empty[winning]]
+            self.wins[p] = np.unique(winning_cells)
+            self.win_windows[p] = list(zip(winning_index.tolist(), winning_cells.tolist()))
+            threatening_index = np.flatnonzero(open_windows & (mine == n - 2))
+            threatening = windows[threatening_index]
+            self.threats[p] = np.bincount(threatening[self.empty[threatening]], minlength=cells)
+            self.threat_windows[p] = set(threatening_index.tolist())
+
+        # Evaluation for `piece` after placing it on each cell: every window
+        # through the cell gains one own piece, plus the center column bonus
+        table = evaluator.table
+        step = n + 1
+        gains = table[np.minimum(codes + step, len(table) - 1)] - table[codes]
+        deltas = np.bincount(windows.ravel(), weights=np.repeat(gains, n), minlength=cells)
+        self.scores = score + deltas.astype(np.int64) + evaluator.center_bonus
+
+    def wins_after(self, piece, cell, mover):
+        """Cells where piece could complete a line once mover has placed on cell
+
+        Uses the shared line index (the Geometry behind evaluator.cell_windows): a piece only
+        changes the windows through its own cell, so every other winning cell
+        is carried over as is.
+        """
+        through = self.evaluator.cell_windows[cell]
+        if mover != piece:
+            # The mover's piece kills every winning window through the cell
+            blocked = set(through)
+            return {empty for window, empty in self.win_windows[piece] if window not in blocked}
+        wins = {empty for _, empty in self.win_windows[piece] if empty != cell}
+        threat_windows = self.threat_windows[piece]
+        empty = self.empty
+        for window in through:
+            if window in threat_windows:
+                for other in self.evaluator.window_cells[window]:
+                    if other != cell and empty[other]:
+                        wins.add(other)
+        return wins
+
+    def cell(self, index):
+        return divmod(int(index), self.evaluator.cols)
+
+    def winning_cells(self, piece):
+        """(row, col) of every empty cell that completes a line for piece, top row first"""
+        return [self.cell(index) for index in self.wins[piece]]
+
+    def best_cell(self):
+        """(row, col) of the empty cell with the best evaluation after placing there, or None"""
+        empty = np.flatnonzero(self.empty)
+        if not len(empty):
+            return None
+        return self.cell(empty[np.argmax(self.scores[empty])])
@@ -0,0 +1,103 @@
+"""Build opening books: deep offline Hard searches for the first plies of every grid size.
+
+For each grid the builder walks every line of the first --plies plies in which
+one side (the book side) plays its searched best move and the other side tries
+every column, for either piece as the book side and either piece moving first.
+Each book position is searched once to --depth. Positions and their mirror
+images share one entry. Books are written to books/ (or --output-dir), where
+the game memory-maps the one for its grid size at start-up.
+
+    python tools/build_opening_book.py [--grids 10x16,19x23] [--plies 4] [--depth 6] [--jobs N]
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BitBoard  # noqa: E402
+from engine import BoardConfig, Engine  # noqa: E402
+from opening_book import book_key, book_path, write_book  # noqa: E402
+
+CONNECT_N = 8
+# Grid sizes custom_grid_menu allows
+SUPPORTED_GRIDS = [(rows, cols) for rows in range(10, 20) for cols in range(16, 24)]
+
+
+def build_book(rows, cols, connect_n, plies, depth, think_time):
+    """{key: column} for every book position of one grid size"""
+    engines = {}
+    for piece in (1, 2):
+        engine = Engine(BoardConfig(rows, cols, connect_n, player_piece=3 - piece, ai_piece=piece), think_time)
+        engine.book = None  # Always search, even if an older book exists
+        engines[piece] = engine
+    entries = {}
+
+    def expand(board, mover, book_piece):
+        if len(board.history) >= plies or board.winner is not None:
+            return
+        if mover == book_piece:
+            key, mirrored = book_key(board, mover)
+            if key in entries:
+                col = entries[key]
+                col = cols - 1 - col if mirrored else col
+            else:
+                engine = engines[mover]
+                col = engine.search(engine.board_from_array(board.to_array(np.intp)), depth).column
+                if col is None:
+                    return
+                entries[key] = cols - 1 - col if mirrored else col
+            columns = [col]
+        else:
+            columns = board.valid_columns()
+        for col in columns:
+            board.drop(col, mover)
+            expand(board, 3 - mover, book_piece)
+            board.undo()
+
+    for book_piece in (1, 2):
+        for first in (1, 2):
+            expand(BitBoard(rows, cols, connect_n), first, book_piece)
+    return entries
+
+
+def build_grid(rows, cols, connect_n, plies, depth, think_time, output_dir):
+    start = time.perf_counter()
+    entries = build_book(rows, cols, connect_n, plies, depth, think_time)
+    path = book_path(rows, cols, connect_n, output_dir)
+    write_book(path, rows, cols, connect_n, plies, entries)
+    return path, len(entries), time.perf_counter() - start
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--grids', default='all', help="'all' or a list like 10x16,19x23")
+    parser.add_argument('--plies', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--think-time', type=float, default=math.inf, help="seconds per search")
+    parser.add_argument('--jobs', type=int, default=1, help="grids built in parallel")
+    parser.add_argument('--output-dir', default=None)
+    args = parser.parse_args()
+
+    if args.grids == 'all':
+        grids = SUPPORTED_GRIDS
+    else:
+        grids = [tuple(int(size) for size in grid.split('x')) for grid in args.grids.split(',')]
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=args.jobs, mp_context=context) as pool:
+        futures = [pool.submit(build_grid, rows, cols, CONNECT_N, args.plies, args.depth, args.think_time,
+                               args.output_dir) for rows, cols in grids]
+        for future in futures:
+            path, count, elapsed = future.result()
+            print(f"{path}: {count} positions in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main_cli()
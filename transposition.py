@@ -0,0 +1,117 @@
+import functools
+import random
+
+# Bound types stored with each entry
+EXACT = 0
+LOWER = 1  # Search failed high: value is at least this
+UPPER = 2  # Search failed low: value is at most this
+
+
+@functools.lru_cache(maxsize=None)
+def zobrist_keys(rows, cols):
+    """64-bit keys indexed [piece][row * cols + col], plus a side-to-move key
+
+    Keys are seeded from the grid size, so a position hashes the same in every
+    process and every run.
+    """
+    rng = random.Random(f"connect8-zobrist-{rows}x{cols}")
+    cells = rows * cols
+    keys = [None, [rng.getrandbits(64) for _ in range(cells)], [rng.getrandbits(64) for _ in range(cells)]]
+    side_key = rng.getrandbits(64)
+    return keys, side_key
+
+
+@functools.lru_cache(maxsize=None)
+def powerup_keys():
+    """64-bit keys indexed [(piece, power-up)], XORed in for every power-up a side holds"""
+    rng = random.Random("connect8-powerups")
+    return {(piece, powerup): rng.getrandbits(64) for piece in (1, 2) for powerup in ('gravity_off', 'column_remover')}
+
+
+class TranspositionTable:
+    """Fixed-size table of searched positions with two-entry buckets
+
+    The first slot of a bucket is depth-preferred: it is only replaced by a search
+    at least as deep, or by anything once its entry is from an older search. The
+    second slot is always replaced, so recent shallow results are kept too.
+    Entries are (key, depth, bound, value, best_move, generation) tuples.
+    """
+
+    def __init__(self, size):
+        self.buckets = max(1, size // 2)
+        self.size = self.buckets * 2
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0  # Probes that found the bucket holding other positions
+        self.stores = 0
+        self.overwrites = 0  # Stores that evicted a different position
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.reset_stats()
+
+    def new_search(self):
+        """Age existing entries so deep results from earlier moves can be replaced"""
+        self.generation += 1
+
+    def probe(self, key):
+        self.probes += 1
+        index = (key % self.buckets) * 2
+        entries = self.entries
+        entry = entries[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        other = entries[index + 1]
+        if other is not None and other[0] == key:
+            self.hits += 1
+            return other
+        if entry is not None or other is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, bound, value, best_move):
+        self.stores += 1
+        index = (key % self.buckets) * 2
+        entries = self.entries
+        entry = (key, depth, bound, value, best_move, self.generation)
+        preferred = entries[index]
+        if (preferred is None or preferred[0] == key or depth >= preferred[1]
+                or preferred[5] != self.generation):
+            if preferred is not None and preferred[0] != key:
+                # Keep the evicted entry around in the always-replace slot
+                replaced = entries[index + 1]
+                if replaced is not None and replaced[0] != preferred[0]:
+                    self.overwrites += 1
+                entries[index + 1] = preferred
+            entries[index] = entry
+        else:
+            replaced = entries[index + 1]
+            if replaced is not None and replaced[0] != key:
+                self.overwrites += 1
+            entries[index + 1] = entry
+
+    def stats(self):
+        probes = self.probes or 1
+        used = sum(1 for entry in self.entries if entry is not None)
+        return {
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / probes,
+            'collisions': self.collisions,
+            'collision_rate': self.collisions / probes,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'fill': used / self.size,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"TT: {stats['probes']} probes, hit rate {stats['hit_rate']:.1%}, "
+                f"collision rate {stats['collision_rate']:.1%}, fill {stats['fill']:.1%}")